@@ -0,0 +1,53 @@
+"""user learning stats materialized view
+
+Revision ID: 0001_user_learning_stats
+Revises: 
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_user_learning_stats'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Materialized views are PostgreSQL-only; SQLite development databases
+    # fall back to the live aggregation in LearningAnalytics
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_user_learning_stats AS
+        SELECT
+            u.id AS user_id,
+            perf.avg_score,
+            COALESCE(sess.total_sessions, 0) AS total_sessions,
+            COALESCE(sess.total_study_minutes, 0) AS total_study_minutes,
+            now() AS updated_at
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, AVG(score) AS avg_score
+            FROM performance
+            GROUP BY user_id
+        ) perf ON perf.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS total_sessions, SUM(duration_minutes) AS total_study_minutes
+            FROM study_sessions
+            GROUP BY user_id
+        ) sess ON sess.user_id = u.id
+    """)
+    # Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ix_mv_user_learning_stats_user_id ON mv_user_learning_stats (user_id)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_user_learning_stats")
@@ -0,0 +1,114 @@
+"""user recent analytics materialized view
+
+Revision ID: 0002_user_recent_analytics
+Revises: 0001_user_learning_stats
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_user_recent_analytics'
+down_revision = '0001_user_learning_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Materialized views are PostgreSQL-only; SQLite development databases
+    # fall back to the live aggregation in PerformanceTracker
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Rolling 30-day aggregates read by PerformanceTracker.get_performance_analytics;
+    # halves follow recording (ID) order, the later half taking the odd row
+    op.execute("""
+        CREATE MATERIALIZED VIEW user_recent_analytics AS
+        WITH ranked_performance AS (
+            SELECT
+                user_id, score, time_taken,
+                row_number() OVER (PARTITION BY user_id ORDER BY id) AS position,
+                count(*) OVER (PARTITION BY user_id) AS total
+            FROM performance
+            WHERE created_at >= now() - interval '30 days'
+        ),
+        ranked_sessions AS (
+            SELECT
+                user_id, duration_minutes, focus_score, reading_speed, completion_percentage,
+                row_number() OVER (PARTITION BY user_id ORDER BY id) AS position,
+                count(*) OVER (PARTITION BY user_id) AS total,
+                sum(CASE WHEN reading_speed > 0 THEN 1 ELSE 0 END)
+                    OVER (PARTITION BY user_id ORDER BY id) AS speed_position,
+                sum(CASE WHEN reading_speed > 0 THEN 1 ELSE 0 END)
+                    OVER (PARTITION BY user_id) AS speed_total
+            FROM study_sessions
+            WHERE start_time >= now() - interval '30 days'
+        ),
+        quiz AS (
+            SELECT
+                user_id,
+                count(*) AS total_quizzes,
+                avg(score) AS average_score,
+                min(score) AS min_score,
+                max(score) AS max_score,
+                avg(CASE WHEN time_taken <> 0 THEN time_taken END) AS average_time,
+                avg(CASE WHEN position * 2 <= total THEN score END) AS early_average,
+                avg(CASE WHEN position * 2 > total THEN score END) AS recent_average
+            FROM ranked_performance
+            GROUP BY user_id
+        ),
+        sess AS (
+            SELECT
+                user_id,
+                count(*) AS total_sessions,
+                sum(duration_minutes) AS total_study_time,
+                avg(CASE WHEN duration_minutes <> 0 THEN duration_minutes END) AS average_session_duration,
+                avg(focus_score) AS average_focus_score,
+                avg(CASE WHEN reading_speed <> 0 THEN reading_speed END) AS average_reading_speed,
+                avg(completion_percentage) AS average_completion,
+                avg(CASE WHEN position * 2 <= total THEN focus_score END) AS early_focus,
+                avg(CASE WHEN position * 2 > total THEN focus_score END) AS recent_focus,
+                max(speed_total) AS speed_sessions,
+                avg(CASE WHEN reading_speed > 0 AND speed_position * 2 <= speed_total
+                    THEN reading_speed END) AS early_speed,
+                avg(CASE WHEN reading_speed > 0 AND speed_position * 2 > speed_total
+                    THEN reading_speed END) AS recent_speed
+            FROM ranked_sessions
+            GROUP BY user_id
+        )
+        SELECT
+            u.id AS user_id,
+            COALESCE(quiz.total_quizzes, 0) AS total_quizzes,
+            quiz.average_score,
+            quiz.min_score,
+            quiz.max_score,
+            quiz.average_time,
+            quiz.early_average,
+            quiz.recent_average,
+            COALESCE(sess.total_sessions, 0) AS total_sessions,
+            sess.total_study_time,
+            sess.average_session_duration,
+            sess.average_focus_score,
+            sess.average_reading_speed,
+            sess.average_completion,
+            sess.early_focus,
+            sess.recent_focus,
+            COALESCE(sess.speed_sessions, 0) AS speed_sessions,
+            sess.early_speed,
+            sess.recent_speed,
+            now() AS updated_at
+        FROM users u
+        LEFT JOIN quiz ON quiz.user_id = u.id
+        LEFT JOIN sess ON sess.user_id = u.id
+    """)
+    # Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ix_user_recent_analytics_user_id ON user_recent_analytics (user_id)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS user_recent_analytics")
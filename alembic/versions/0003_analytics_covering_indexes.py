@@ -0,0 +1,43 @@
+"""analytics covering indexes on performance and study_sessions
+
+Revision ID: 0003_analytics_indexes
+Revises: 0002_user_recent_analytics
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_analytics_indexes'
+down_revision = '0002_user_recent_analytics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # PostgreSQL builds the indexes CONCURRENTLY, which cannot run inside a
+    # transaction, so they are created in an autocommit block without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_perf_user_created', 'performance', ['user_id', sa.text('created_at DESC')],
+            postgresql_include=['score', 'time_taken', 'comprehension_speed'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_perf_quiz', 'performance', ['quiz_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_session_user_start', 'study_sessions', ['user_id', sa.text('start_time DESC')],
+            postgresql_include=['duration_minutes', 'focus_score', 'reading_speed', 'completion_percentage'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_session_user_start', table_name='study_sessions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_perf_quiz', table_name='performance', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_perf_user_created', table_name='performance', postgresql_concurrently=True, if_exists=True)
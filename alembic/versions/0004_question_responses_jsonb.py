@@ -0,0 +1,42 @@
+"""store performance.question_responses as jsonb
+
+Revision ID: 0004_question_responses_jsonb
+Revises: 0003_analytics_indexes
+Create Date: 2026-10-15 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_question_responses_jsonb'
+down_revision = '0003_analytics_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # JSONB is PostgreSQL-only; other databases keep the generic JSON column
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'performance', 'question_responses',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='question_responses::jsonb'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'performance', 'question_responses',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='question_responses::json'
+    )
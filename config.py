@@ -21,6 +21,9 @@ class Settings:
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     UPLOAD_DIR: str = "uploads"
     
+    # PDF text extraction backend: "pypdf" (default), "pypdfium2" or "pymupdf"
+    PDF_BACKEND: str = os.getenv("NEUROPACE_PDF_BACKEND", "pypdf")
+    
     # Quiz generation
     QUIZ_QUESTIONS_PER_SECTION: int = 5
     MIN_QUIZ_DIFFICULTY: float = 0.3
@@ -1,15 +1,33 @@
+import json
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON column encoding
+    orjson = None
+
+def _json_serializer(value) -> str:
+    """Encode JSON columns with orjson when installed, like json.dumps otherwise"""
+    if orjson is None:
+        return json.dumps(value)
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _json_deserializer(value):
+    """Decode JSON columns with orjson when installed"""
+    return orjson.loads(value) if orjson is not None else json.loads(value)
+
 # Create engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
     pool_size=10,
-    max_overflow=20
+    max_overflow=20,
+    json_serializer=_json_serializer,
+    json_deserializer=_json_deserializer
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
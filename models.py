@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -133,7 +134,7 @@ class Performance(Base):
     retention_score = Column(Float)  # based on follow-up quizzes
     
     # Response analysis
-    question_responses = Column(JSON, default=dict)  # detailed responses
+    question_responses = Column(JSON().with_variant(JSONB(), 'postgresql'), default=dict)  # detailed responses
     difficulty_handled = Column(Float)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -142,6 +143,15 @@ class Performance(Base):
     user = relationship("User", back_populates="performance_records")
     quiz = relationship("Quiz", back_populates="performance_records")
     study_session = relationship("StudySession", back_populates="performance_records")
+    
+    __table_args__ = (
+        # Analytics windows filter by user and recency; included columns allow index-only scans
+        Index(
+            'ix_perf_user_created', 'user_id', created_at.desc(),
+            postgresql_include=['score', 'time_taken', 'comprehension_speed']
+        ),
+        Index('ix_perf_quiz', 'quiz_id'),
+    )
 
 class StudySession(Base):
     __tablename__ = "study_sessions"
@@ -177,3 +187,10 @@ class StudySession(Base):
     user = relationship("User", back_populates="study_sessions")
     schedule = relationship("Schedule", back_populates="study_sessions")
     performance_records = relationship("Performance", back_populates="study_session")
+    
+    __table_args__ = (
+        Index(
+            'ix_session_user_start', 'user_id', start_time.desc(),
+            postgresql_include=['duration_minutes', 'focus_score', 'reading_speed', 'completion_percentage']
+        ),
+    )
@@ -0,0 +1,25 @@
+"""
+Refresh precomputed analytics views
+Run periodically (e.g. from cron) to keep per-user aggregates current
+"""
+
+from sqlalchemy import text
+from database import SessionLocal, engine
+
+MATERIALIZED_VIEWS = ['mv_user_learning_stats', 'user_recent_analytics']
+
+def refresh_materialized_views():
+    """Refresh all analytics materialized views without blocking readers"""
+    if engine.dialect.name != 'postgresql':
+        return
+
+    db = SessionLocal()
+    try:
+        for view_name in MATERIALIZED_VIEWS:
+            db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}"))
+        db.commit()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    refresh_materialized_views()
@@ -1,8 +1,8 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.orm import Session, defer
+from database import get_db, SessionLocal
 from models import User, Performance, StudySession, Material, Quiz
 from schemas import Performance as PerformanceSchema, PerformanceCreate
 from auth import get_current_active_user
@@ -78,7 +78,8 @@ async def get_quiz_history(
 ):
     """Get quiz performance history for the current user"""
     
-    query = db.query(Performance).filter(
+    # question_responses is not part of the response schema, so its JSON is not loaded
+    query = db.query(Performance).options(defer(Performance.question_responses)).filter(
         Performance.user_id == current_user.id,
         Performance.quiz_id.isnot(None)
     )
@@ -158,7 +159,7 @@ async def get_performance_summary(
     cutoff_date = datetime.utcnow() - timedelta(days=30)
     
     # Quiz performances
-    quiz_performances = db.query(Performance).filter(
+    quiz_performances = db.query(Performance.score, Performance.created_at).filter(
         Performance.user_id == current_user.id,
         Performance.quiz_id.isnot(None),
         Performance.created_at >= cutoff_date
@@ -236,7 +237,7 @@ async def get_materials_progress(
     materials_progress = []
     for material in materials:
         # Get quiz performances for this material
-        quiz_performances = db.query(Performance).join(Quiz).filter(
+        quiz_performances = db.query(Performance.score).join(Quiz).filter(
             Performance.user_id == current_user.id,
             Quiz.material_id == material.id
         ).order_by(Performance.created_at.desc()).limit(10).all()
@@ -405,7 +406,7 @@ async def record_quiz_performance(
             detail="Quiz not found"
         )
     
-    tracker = PerformanceTracker(db)
+    tracker = PerformanceTracker(db, db_session_factory=SessionLocal)
     result = tracker.record_quiz_performance(
         user_id=current_user.id,
         quiz_id=performance_data.quiz_id,
@@ -422,10 +423,66 @@ async def record_quiz_performance(
             detail=result.get('error', 'Failed to record performance')
         )
     
+    db.commit()
+    
     # Get the created performance record
     performance = db.query(Performance).filter(Performance.id == result['performance_id']).first()
     return performance
 
+@router.post("/record-quizzes", response_model=List[PerformanceSchema])
+async def record_quiz_performances(
+    performances_data: List[PerformanceCreate],
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Record several quiz performances in one request"""
+    
+    if any(not performance_data.quiz_id for performance_data in performances_data):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quiz ID is required for quiz performance recording"
+        )
+    
+    # Verify all quizzes exist and belong to user's materials in one query
+    quiz_ids = {performance_data.quiz_id for performance_data in performances_data}
+    owned_quiz_count = db.query(Quiz.id).join(Material).filter(
+        Quiz.id.in_(quiz_ids),
+        Material.user_id == current_user.id
+    ).count()
+    
+    if owned_quiz_count != len(quiz_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    tracker = PerformanceTracker(db, db_session_factory=SessionLocal)
+    result = tracker.record_quiz_performances_bulk([
+        {
+            'user_id': current_user.id,
+            'quiz_id': performance_data.quiz_id,
+            'score': performance_data.score,
+            'time_taken': performance_data.time_taken,
+            'questions_correct': performance_data.questions_correct,
+            'questions_total': performance_data.questions_total,
+            'question_responses': performance_data.question_responses
+        }
+        for performance_data in performances_data
+    ])
+    
+    if not result['success']:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=result.get('error', 'Failed to record performances')
+        )
+    
+    db.commit()
+    
+    # Get the created performance records in submission order
+    performances = db.query(Performance).filter(Performance.id.in_(result['performance_ids'])).all()
+    performances_by_id = {performance.id: performance for performance in performances}
+    return [performances_by_id[performance_id] for performance_id in result['performance_ids']]
+
 @router.delete("/{performance_id}")
 async def delete_performance_record(
     performance_id: int,
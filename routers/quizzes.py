@@ -1,7 +1,7 @@
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from models import User, Material, Quiz
 from schemas import Quiz as QuizSchema, QuizCreate
 from auth import get_current_active_user
@@ -217,7 +217,7 @@ async def submit_quiz(
     
     # Record performance
     from services.performance_tracker import PerformanceTracker
-    tracker = PerformanceTracker(db)
+    tracker = PerformanceTracker(db, db_session_factory=SessionLocal)
     
     performance_result = tracker.record_quiz_performance(
         user_id=current_user.id,
@@ -238,6 +238,8 @@ async def submit_quiz(
             detail="Failed to record performance"
         )
     
+    db.commit()
+    
     return {
         'score': validation_result['score'],
         'correct_count': validation_result['correct_count'],
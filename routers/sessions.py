@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from models import User, StudySession, Schedule, Material
 from schemas import StudySession as StudySessionSchema, StudySessionCreate, StudySessionUpdate
 from auth import get_current_active_user
@@ -139,7 +139,7 @@ async def complete_study_session(
             db.commit()
     
     # Record session performance
-    tracker = PerformanceTracker(db)
+    tracker = PerformanceTracker(db, db_session_factory=SessionLocal)
     session_performance_data = {
         'start_time': study_session.start_time,
         'end_time': study_session.end_time,
@@ -159,6 +159,8 @@ async def complete_study_session(
         session_data=session_performance_data
     )
     
+    db.commit()
+    
     db.refresh(study_session)
     
     return {
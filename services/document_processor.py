@@ -7,27 +7,62 @@ import pypdf as PyPDF2
 import os
 import re
 import math
-from typing import Dict, Any, Optional, List
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from io import BytesIO
 import numpy as np
 from collections import Counter
 from sqlalchemy.orm import Session
 
+# Common English stop words excluded from keyword and complexity analysis
+_STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'is', 'are', 'was', 'were', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'this', 'that', 'these', 'those'
+])
+
+# Learning objective patterns, compiled once and tagged with their objective type
+_OBJECTIVE_PATTERNS = [
+    ('understand', re.compile(r'understand\s+([^.]+)')),
+    ('learn', re.compile(r'learn\s+about\s+([^.]+)')),
+    ('explain', re.compile(r'explain\s+([^.]+)')),
+    ('describe', re.compile(r'describe\s+([^.]+)')),
+    ('analyze', re.compile(r'analyze\s+([^.]+)')),
+    ('identify', re.compile(r'identify\s+([^.]+)')),
+    ('define', re.compile(r'define\s+([^.]+)'))
+]
+
+# Minimum trigram Jaccard similarity for keywords to share a topic
+_TOPIC_SIMILARITY_THRESHOLD = 0.3
+
+# Upper bound for per-word statistics stored in uint16 arrays
+_MAX_WORD_STAT = np.iinfo(np.uint16).max
+
+# Sentence boundary splitter shared by all text statistics
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Information markers used for content density scoring
+_INFO_WORDS = frozenset(['however', 'therefore', 'because', 'although', 'moreover', 'furthermore'])
+
 class DocumentProcessor:
     """
     Enhanced document processing service with ML-driven content analysis
     Supports multiple document types with advanced text analytics
     """
     
+    # Processed results keyed by content hash, shared across instances
+    _result_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+    _result_cache_lock = threading.Lock()
+    _result_cache_size = 128
+    
     def __init__(self):
         # Initialize TF-IDF and other NLP components
-        self.stop_words = set([
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'is', 'are', 'was', 'were', 'be',
-            'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-            'would', 'could', 'should', 'this', 'that', 'these', 'those'
-        ])
+        self.stop_words = _STOP_WORDS
     
     def process_document(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """
@@ -40,33 +75,65 @@ class DocumentProcessor:
         Returns:
             Comprehensive document analysis results
         """
+        cache_key = (hashlib.blake2b(file_content, digest_size=32).digest(), filename)
+        with self._result_cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        result = self._process_document_uncached(file_content, filename)
+        if result['success']:
+            with self._result_cache_lock:
+                self._result_cache[cache_key] = copy.deepcopy(result)
+                if len(self._result_cache) > self._result_cache_size:
+                    self._result_cache.popitem(last=False)
+        return result
+    
+    def _process_document_uncached(self, file_content: bytes, filename: str) -> Dict[str, Any]:
+        """Run the full processing pipeline without consulting the result cache"""
         try:
             # Step 1: Text Extraction
             extraction_result = self._extract_text_content(file_content, filename)
             if not extraction_result['success']:
                 return extraction_result
             
+            full_text = extraction_result['full_text']
+            
+            # Tokenize once and share across all analysis stages
+            words = full_text.split()
+            sentences = self._split_sentences(full_text)
+            paragraphs = self._split_paragraphs(full_text)
+            word_stats = self._word_statistics(words)
+            
             # Step 2: Content Structure Analysis
-            structure_analysis = self.analyze_content_structure(extraction_result['full_text'])
+            structure_analysis = self.analyze_content_structure(
+                full_text, words=words, sentences=sentences, paragraphs=paragraphs,
+                word_stats=word_stats
+            )
             
             # Step 3: Readability and Difficulty Analysis
-            readability_analysis = self._advanced_readability_analysis(extraction_result['full_text'])
+            readability_analysis = self._advanced_readability_analysis(
+                full_text, words=words, sentences=sentences, word_stats=word_stats
+            )
             
             # Step 4: Keyword and Topic Extraction
-            keyword_analysis = self._extract_keywords_and_topics(extraction_result['full_text'])
+            keyword_analysis = self._extract_keywords_and_topics(full_text)
             
             # Step 5: Learning Objective Identification
-            learning_objectives = self._identify_learning_objectives(extraction_result['full_text'])
+            learning_objectives = self._identify_learning_objectives(full_text)
             
             # Step 6: Content Segmentation for Optimal Learning
             content_segments = self._intelligent_content_segmentation(
-                extraction_result['full_text'],
-                readability_analysis['difficulty_score']
+                full_text,
+                readability_analysis['difficulty_score'],
+                paragraphs=paragraphs
             )
             
             return {
                 'success': True,
-                'full_text': extraction_result['full_text'],
+                'full_text': full_text,
                 'metadata': extraction_result['metadata'],
                 'structure_analysis': structure_analysis,
                 'readability_analysis': readability_analysis,
@@ -87,34 +154,50 @@ class DocumentProcessor:
                 'stage': 'document_processing'
             }
     
-    def analyze_content_structure(self, text: str) -> Dict[str, Any]:
+    def analyze_content_structure(
+        self,
+        text: str,
+        words: Optional[List[str]] = None,
+        sentences: Optional[List[str]] = None,
+        paragraphs: Optional[List[str]] = None,
+        word_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Dict[str, Any]:
         """
         Advanced content structure analysis
         
         Args:
             text: Full text content
+            words: Pre-split words (computed from text if omitted)
+            sentences: Pre-split sentences (computed from text if omitted)
+            paragraphs: Pre-split paragraphs (computed from text if omitted)
+            word_stats: Per-word lengths and syllables from _word_statistics
             
         Returns:
             Detailed structure analysis
         """
         try:
             # Basic text statistics
-            words = text.split()
-            sentences = re.split(r'[.!?]+', text)
-            sentences = [s.strip() for s in sentences if s.strip()]
-            paragraphs = text.split('\n\n')
-            paragraphs = [p.strip() for p in paragraphs if p.strip()]
+            if words is None:
+                words = text.split()
+            if sentences is None:
+                sentences = self._split_sentences(text)
+            if paragraphs is None:
+                paragraphs = self._split_paragraphs(text)
             
             # Advanced metrics
             avg_sentence_length = len(words) / len(sentences) if sentences else 0
             avg_paragraph_length = len(sentences) / len(paragraphs) if paragraphs else 0
             
             # Complexity indicators
-            complex_words = [w for w in words if len(w) > 6 and not w.lower() in self.stop_words]
+            complex_word_count = sum(1 for w in words if len(w) > 6 and w.lower() not in self.stop_words)
             technical_terms = self._identify_technical_terms(words)
             
             # Estimated difficulty
-            difficulty_score = self._calculate_advanced_difficulty(text, words, sentences)
+            difficulty_score = self._calculate_advanced_difficulty(
+                text, words, sentences,
+                word_stats=word_stats,
+                technical_terms=technical_terms
+            )
             
             # Reading time estimation with user adaptation
             base_reading_speed = 200  # words per minute
@@ -128,12 +211,12 @@ class DocumentProcessor:
                 'character_count': len(text),
                 'avg_sentence_length': round(avg_sentence_length, 2),
                 'avg_paragraph_length': round(avg_paragraph_length, 2),
-                'complex_word_ratio': len(complex_words) / len(words) if words else 0,
+                'complex_word_ratio': complex_word_count / len(words) if words else 0,
                 'technical_term_count': len(technical_terms),
                 'technical_terms': technical_terms[:10],  # Top 10 technical terms
                 'estimated_difficulty': difficulty_score,
                 'estimated_reading_time': round(estimated_reading_time, 2),
-                'content_density': self._calculate_content_density(text),
+                'content_density': self._calculate_content_density(text, words),
                 'structural_complexity': self._analyze_structural_complexity(paragraphs)
             }
             
@@ -322,24 +405,33 @@ class DocumentProcessor:
                 'metadata': {'filename': filename}
             }
     
-    def _advanced_readability_analysis(self, text: str) -> Dict[str, Any]:
+    def _advanced_readability_analysis(
+        self,
+        text: str,
+        words: Optional[List[str]] = None,
+        sentences: Optional[List[str]] = None,
+        word_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Dict[str, Any]:
         """Advanced readability analysis using multiple metrics"""
         if not text or not text.strip():
             return {'difficulty_score': 0.5, 'readability_metrics': {}}
         
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        if words is None:
+            words = text.split()
+        if sentences is None:
+            sentences = self._split_sentences(text)
         
         if not words or not sentences:
             return {'difficulty_score': 0.5, 'readability_metrics': {}}
         
+        word_lengths, syllables = word_stats if word_stats is not None else self._word_statistics(words)
+        
         # Basic metrics
         avg_sentence_length = len(words) / len(sentences)
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        avg_word_length = float(word_lengths.mean(dtype=np.float64))
         
         # Syllable counting for more accurate analysis
-        total_syllables = sum(self._count_syllables(word) for word in words)
+        total_syllables = int(syllables.sum(dtype=np.int64))
         avg_syllables_per_word = total_syllables / len(words)
         
         # Flesch Reading Ease Score
@@ -349,8 +441,7 @@ class DocumentProcessor:
         fk_grade = (0.39 * avg_sentence_length) + (11.8 * avg_syllables_per_word) - 15.59
         
         # Gunning Fog Index
-        complex_words = [w for w in words if self._count_syllables(w) >= 3]
-        complex_word_ratio = len(complex_words) / len(words)
+        complex_word_ratio = np.count_nonzero(syllables >= 3) / len(words)
         gunning_fog = 0.4 * (avg_sentence_length + (100 * complex_word_ratio))
         
         # SMOG Index (simplified)
@@ -415,25 +506,16 @@ class DocumentProcessor:
     def _identify_learning_objectives(self, text: str) -> List[Dict[str, Any]]:
         """Identify potential learning objectives from content"""
         # Simplified pattern matching for learning objectives
-        objective_patterns = [
-            r'understand\s+([^.]+)',
-            r'learn\s+about\s+([^.]+)',
-            r'explain\s+([^.]+)',
-            r'describe\s+([^.]+)',
-            r'analyze\s+([^.]+)',
-            r'identify\s+([^.]+)',
-            r'define\s+([^.]+)'
-        ]
+        text_lower = text.lower()
         
         objectives = []
-        for pattern in objective_patterns:
-            matches = re.finditer(pattern, text.lower())
-            for match in matches:
+        for objective_type, pattern in _OBJECTIVE_PATTERNS:
+            for match in pattern.finditer(text_lower):
                 objective_text = match.group(1).strip()
                 if len(objective_text) > 5 and len(objective_text) < 100:
                     objectives.append({
                         'objective': objective_text.capitalize(),
-                        'type': pattern.split('\\s+')[0],
+                        'type': objective_type,
                         'confidence': 0.7  # Simple confidence score
                     })
         
@@ -449,10 +531,15 @@ class DocumentProcessor:
         
         return unique_objectives
     
-    def _intelligent_content_segmentation(self, text: str, difficulty_score: float) -> List[Dict[str, Any]]:
+    def _intelligent_content_segmentation(
+        self,
+        text: str,
+        difficulty_score: float,
+        paragraphs: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Intelligent content segmentation for optimal learning"""
-        paragraphs = text.split('\n\n')
-        paragraphs = [p.strip() for p in paragraphs if p.strip()]
+        if paragraphs is None:
+            paragraphs = self._split_paragraphs(text)
         
         # Adaptive section size based on difficulty
         base_words_per_section = 400
@@ -519,7 +606,14 @@ class DocumentProcessor:
             'difficulty': difficulty
         }
     
-    def _calculate_advanced_difficulty(self, text: str, words: List[str], sentences: List[str]) -> float:
+    def _calculate_advanced_difficulty(
+        self,
+        text: str,
+        words: List[str],
+        sentences: List[str],
+        word_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        technical_terms: Optional[List[str]] = None
+    ) -> float:
         """Calculate advanced difficulty score"""
         if not words or not sentences:
             return 0.5
@@ -531,20 +625,25 @@ class DocumentProcessor:
         avg_sentence_length = len(words) / len(sentences)
         factors.append(min(1.0, avg_sentence_length / 25.0))  # Normalize to 25 words max
         
+        word_lengths, syllables = word_stats if word_stats is not None else self._word_statistics(words)
+        
         # 2. Average word length
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        avg_word_length = float(word_lengths.mean(dtype=np.float64))
         factors.append(min(1.0, (avg_word_length - 3) / 5.0))  # Normalize to 3-8 chars
         
         # 3. Complex word ratio
-        complex_words = [w for w in words if len(w) > 6]
-        factors.append(len(complex_words) / len(words))
+        complex_word_count = np.count_nonzero(word_lengths > 6)
+        factors.append(complex_word_count / len(words))
         
         # 4. Technical term density
-        technical_terms = self._identify_technical_terms(words)
-        factors.append(min(1.0, len(technical_terms) / (len(words) / 100)))  # Per 100 words
+        if technical_terms is None:
+            technical_term_count = self._count_technical_terms(words)
+        else:
+            technical_term_count = len(technical_terms)
+        factors.append(min(1.0, technical_term_count / (len(words) / 100)))  # Per 100 words
         
         # 5. Syllable complexity
-        total_syllables = sum(self._count_syllables(word) for word in words)
+        total_syllables = int(syllables.sum(dtype=np.int64))
         avg_syllables = total_syllables / len(words)
         factors.append(min(1.0, (avg_syllables - 1) / 2.0))  # Normalize to 1-3 syllables
         
@@ -556,34 +655,33 @@ class DocumentProcessor:
     
     def _identify_technical_terms(self, words: List[str]) -> List[str]:
         """Identify technical terms in the text"""
-        # Simple heuristics for technical terms
-        technical_terms = []
+        return list({word for word in words if self._is_technical_term(word)})  # Remove duplicates
+    
+    def _count_technical_terms(self, words: List[str]) -> int:
+        """Count distinct technical terms without materializing the term list"""
+        return len({word for word in words if self._is_technical_term(word)})
+    
+    def _is_technical_term(self, word: str) -> bool:
+        """Simple heuristics for technical terms"""
+        # Skip if it's a common word
+        if word.lower() in self.stop_words:
+            return False
         
-        for word in words:
-            word_lower = word.lower()
-            # Skip if it's a common word
-            if word_lower in self.stop_words:
-                continue
-            
-            # Heuristics for technical terms
-            if (len(word) > 8 or  # Long words
+        return (len(word) > 8 or  # Long words
                 word.isupper() or  # Acronyms
                 '_' in word or  # Underscore terms
                 any(char.isdigit() for char in word) or  # Contains numbers
-                word.endswith(('tion', 'sion', 'ment', 'ness', 'ity', 'ism'))):  # Technical suffixes
-                technical_terms.append(word)
-        
-        return list(set(technical_terms))  # Remove duplicates
+                word.endswith(('tion', 'sion', 'ment', 'ness', 'ity', 'ism')))  # Technical suffixes
     
-    def _calculate_content_density(self, text: str) -> float:
+    def _calculate_content_density(self, text: str, words: Optional[List[str]] = None) -> float:
         """Calculate information density of content"""
-        words = text.split()
+        if words is None:
+            words = text.split()
         if not words:
             return 0.0
         
         # Information markers
-        info_words = ['however', 'therefore', 'because', 'although', 'moreover', 'furthermore']
-        info_count = sum(1 for word in words if word.lower() in info_words)
+        info_count = sum(1 for word in words if word.lower() in _INFO_WORDS)
         
         # Question marks (indicate complexity)
         question_count = text.count('?')
@@ -601,12 +699,12 @@ class DocumentProcessor:
             return 0.0
         
         # Variation in paragraph lengths
-        para_lengths = [len(p.split()) for p in paragraphs]
-        if not para_lengths:
-            return 0.0
+        para_lengths = np.fromiter(
+            (len(p.split()) for p in paragraphs), dtype=np.int32, count=len(paragraphs)
+        )
         
-        avg_length = sum(para_lengths) / len(para_lengths)
-        variance = sum((l - avg_length) ** 2 for l in para_lengths) / len(para_lengths)
+        avg_length = float(para_lengths.mean(dtype=np.float64))
+        variance = float(para_lengths.var(dtype=np.float64))
         
         # Normalize structural complexity
         complexity = min(1.0, variance / (avg_length ** 2) if avg_length > 0 else 0)
@@ -622,15 +720,26 @@ class DocumentProcessor:
         topics = []
         used_words = set()
         
+        # Character trigram signatures, computed once per keyword
+        signatures = {
+            word: frozenset(word[i:i + 3] for i in range(len(word) - 2))
+            for word, _ in keywords
+        }
+        
         for word, score in keywords[:10]:  # Top 10 keywords
             if word not in used_words:
                 # Create a topic centered around this keyword
                 topic_words = [word]
                 used_words.add(word)
+                word_signature = signatures[word]
                 
-                # Find related words (simple similarity based on shared characters)
+                # Find related words (Jaccard similarity of character trigrams)
                 for other_word, other_score in keywords:
-                    if other_word not in used_words and len(set(word) & set(other_word)) >= 3:
+                    if other_word in used_words:
+                        continue
+                    other_signature = signatures[other_word]
+                    shared = len(word_signature & other_signature)
+                    if shared and shared / len(word_signature | other_signature) >= _TOPIC_SIMILARITY_THRESHOLD:
                         topic_words.append(other_word)
                         used_words.add(other_word)
                         if len(topic_words) >= 3:
@@ -657,8 +766,7 @@ class DocumentProcessor:
         complex_words = [w for w in words if len(w) > 6]
         complexity_ratio = len(complex_words) / len(words)
         
-        sentences = re.split(r'[.!?]+', segment)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        sentences = self._split_sentences(segment)
         avg_sentence_length = len(words) / len(sentences) if sentences else 0
         
         # Combine factors
@@ -674,12 +782,24 @@ class DocumentProcessor:
         difficulty_factor = base_difficulty
         
         # Information density factor
-        info_density = self._calculate_content_density(text)
+        info_density = self._calculate_content_density(text, words)
         
         # Combine factors
         cognitive_load = (word_count_factor * 0.3) + (difficulty_factor * 0.5) + (info_density * 0.2)
         return min(1.0, cognitive_load)
     
+    def _word_statistics(self, words: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-word character lengths and syllable counts as compact integer arrays"""
+        count = len(words)
+        word_lengths = np.fromiter(
+            (min(len(word), _MAX_WORD_STAT) for word in words), dtype=np.uint16, count=count
+        )
+        syllables = np.fromiter(
+            (min(self._count_syllables(word), _MAX_WORD_STAT) for word in words),
+            dtype=np.uint16, count=count
+        )
+        return word_lengths, syllables
+    
     def _count_syllables(self, word: str) -> int:
         """Count syllables in a word (improved algorithm)"""
         word = word.lower().strip('.,!?;:"')
@@ -706,6 +826,14 @@ class DocumentProcessor:
         
         return max(1, syllable_count)
     
+    def _split_sentences(self, text: str) -> List[str]:
+        """Split text into non-empty, stripped sentences"""
+        return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+    
+    def _split_paragraphs(self, text: str) -> List[str]:
+        """Split text into non-empty, stripped paragraphs"""
+        return [p.strip() for p in text.split('\n\n') if p.strip()]
+    
     def _estimate_reading_time(self, word_count: int, reading_speed: float = 200.0) -> float:
         """Estimate reading time with improved accuracy"""
         if word_count <= 0:
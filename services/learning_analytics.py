@@ -3,21 +3,154 @@ Enhanced Learning Analytics Service
 Implements comprehensive learning analytics with predictive modeling
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple, Sequence, Mapping
+from types import MappingProxyType
 import math
+import operator
 import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.engine import Row
+from sqlalchemy import func, and_, select, table, column, inspect
+from sqlalchemy.exc import DBAPIError
 from collections import defaultdict
+from functools import lru_cache
+from bisect import bisect_right
 from models import User, Performance, StudySession, Quiz, Material, Schedule
 
+# Storage precision for per-user score buffers; float64 keeps rounded averages
+# identical to summing the Python floats
+_ANALYTICS_DTYPE = np.float64
+
+# Learning health component weights: performance, behavior, efficiency
+_HEALTH_WEIGHTS = (0.4, 0.3, 0.3)
+
+# Learning health category boundaries (lower bound inclusive) and their labels
+_HEALTH_THRESHOLDS = (0.6, 0.7, 0.8)
+_HEALTH_CATEGORIES = ('needs_improvement', 'fair', 'good', 'excellent')
+
+# Pattern fields read together by the strength, difficulty and health calculations
+_get_performance_fields = operator.itemgetter('average_score', 'improvement_rate', 'consistency_score')
+_get_behavior_fields = operator.itemgetter('average_focus_score', 'session_consistency')
+
+# Analysis confidence by number of data points (lower bound inclusive)
+_CONFIDENCE_THRESHOLDS = (2, 5, 10)
+_CONFIDENCE_VALUES = (0.3, 0.5, 0.7, 0.9)
+
+# Strength/weakness rules: (strength test, strength threshold, strength,
+# weakness upper bound (exclusive), weakness)
+_STRENGTH_WEAKNESS_RULES = (
+    (operator.ge, 0.8, 'High performance consistency', 0.6, 'Below average performance'),
+    (operator.gt, 0.1, 'Strong learning progression', -0.05, 'Declining performance trend'),
+    (operator.gt, 0.8, 'Consistent performance', 0.6, 'Inconsistent performance'),
+    (operator.gt, 0.7, 'High focus and attention', 0.5, 'Attention and focus challenges'),
+    (operator.gt, 0.7, 'Regular study habits', 0.5, 'Irregular study schedule')
+)
+
+# Difficulty progression by case index (0 maintain, 1 decrease, 2 increase):
+# (recommendation, base, performance weight, lower clamp, upper clamp)
+_DIFFICULTY_PROGRESSION_TABLE = (
+    ('maintain', 0.5, 0.2, -math.inf, math.inf),
+    ('decrease', 0.0, 0.8, 0.3, math.inf),
+    ('increase', 0.7, 0.3, -math.inf, 1.0)
+)
+
+# Columns read by the pattern analyses; selecting them directly skips ORM entity construction
+_PERFORMANCE_ANALYTICS_COLUMNS = (
+    Performance.id,
+    Performance.quiz_id,
+    Performance.score,
+    Performance.time_taken,
+    Performance.created_at
+)
+_STUDY_SESSION_ANALYTICS_COLUMNS = (
+    StudySession.id,
+    StudySession.schedule_id,
+    StudySession.start_time,
+    StudySession.end_time,
+    StudySession.duration_minutes,
+    StudySession.focus_score
+)
+
+@lru_cache(maxsize=4096)
+def _predict_learning_metrics(
+    word_count: int,
+    difficulty: float,
+    reading_speed: float,
+    experience_level: float,
+    base_retention: float
+) -> Tuple[float, float, int, float]:
+    """Pure prediction of (completion time, retention rate, sessions needed, adaptation rate)"""
+    # Predict completion time
+    base_time = word_count / reading_speed
+    difficulty_multiplier = 1 + (difficulty * 0.5)
+    experience_adjustment = 1 - (experience_level * 0.2)
+    completion_time = base_time * difficulty_multiplier * experience_adjustment
+    
+    # Predict retention rate
+    difficulty_penalty = difficulty * 0.15
+    retention_rate = max(0.5, base_retention - difficulty_penalty)
+    
+    # Predict sessions needed
+    base_sessions = max(3, int(completion_time / 60))  # 1 hour per session
+    sessions_needed = int(base_sessions * (1 + difficulty * 0.3))
+    
+    # Predict difficulty adaptation
+    adaptation_rate = experience_level * 0.3 + 0.7
+    
+    return (
+        round(completion_time, 1),
+        round(retention_rate, 3),
+        sessions_needed,
+        round(adaptation_rate, 3)
+    )
+
+def _to_plain_dict(mapping: Mapping[str, Any]) -> Dict[str, Any]:
+    """Copy a (possibly nested) read-only mapping into plain dicts that deepcopy and JSON accept"""
+    return {
+        key: _to_plain_dict(value) if isinstance(value, Mapping) else value
+        for key, value in mapping.items()
+    }
+
 class LearningAnalytics:
     """
     Advanced learning analytics service with ML-powered insights
     Provides comprehensive analysis of learning patterns and performance prediction
     """
     
+    # Whether mv_user_learning_stats exists, checked once per process on first use
+    _user_stats_view_available: Optional[bool] = None
+    
+    # Read-only fallback templates; the _get_default_* accessors hand out plain dict copies
+    _DEFAULT_LEARNING_PROFILE = MappingProxyType({
+        'reading_speed': 200,
+        'current_level': 0.5,
+        'difficulty_tolerance': 0.5,
+        'cognitive_profile': MappingProxyType({
+            'capacity': 0.8,
+            'attention_span': 45,
+            'processing_speed': 0.7
+        })
+    })
+    _DEFAULT_PERFORMANCE_PATTERNS = MappingProxyType({
+        'average_score': 0.5,
+        'score_trend': 'stable',
+        'consistency_score': 0.5,
+        'improvement_rate': 0.0,
+        'time_efficiency': MappingProxyType({'efficiency_score': 0.5}),
+        'total_assessments': 0,
+        'performance_volatility': 0.0
+    })
+    _DEFAULT_BEHAVIOR_PATTERNS = MappingProxyType({
+        'average_session_duration': 30,
+        'average_focus_score': 0.5,
+        'preferred_study_time': 9,
+        'session_consistency': MappingProxyType({'consistency_score': 0.5}),
+        'total_study_time': 0,
+        'total_sessions': 0,
+        'engagement_level': 0.5
+    })
+    
     def __init__(self, db: Session):
         self.db = db
         # Analytics model parameters
@@ -28,6 +161,8 @@ class LearningAnalytics:
             'performance_trend_window': 14,  # Days
             'confidence_threshold': 0.8
         }
+        # Per-instance (request-scoped) cache of user profiles keyed by user ID
+        self._profile_cache: Dict[int, Dict[str, Any]] = {}
     
     def initialize_material_baseline(
         self,
@@ -74,7 +209,7 @@ class LearningAnalytics:
                 'learning_trajectory': learning_trajectory,
                 'monitoring_baselines': monitoring_baselines,
                 'initialization_metadata': {
-                    'initialized_at': datetime.utcnow().isoformat(),
+                    'initialized_at': datetime.now(timezone.utc).isoformat(),
                     'content_difficulty': content_analysis.get('estimated_difficulty', 0.5),
                     'user_experience_level': user_profile['experience_level']
                 }
@@ -113,7 +248,7 @@ class LearningAnalytics:
             performance_patterns = self._analyze_performance_patterns(learning_data['performances'])
             
             # Analyze study behavior patterns
-            behavior_patterns = self._analyze_study_behavior_patterns(learning_data['study_sessions'])
+            behavior_patterns = self._analyze_study_behavior_patterns(learning_data)
             
             # Analyze temporal patterns
             temporal_patterns = self._analyze_temporal_learning_patterns(learning_data)
@@ -146,7 +281,7 @@ class LearningAnalytics:
                 'difficulty_progression': difficulty_progression,
                 'learning_health_score': learning_health_score,
                 'analysis_metadata': {
-                    'analysis_date': datetime.utcnow().isoformat(),
+                    'analysis_date': datetime.now(timezone.utc).isoformat(),
                     'data_points_analyzed': len(learning_data['performances']) + len(learning_data['study_sessions']),
                     'analysis_confidence': self._calculate_analysis_confidence(learning_data)
                 }
@@ -204,7 +339,7 @@ class LearningAnalytics:
                 'recommendations': load_recommendations,
                 'timing_optimizations': timing_optimizations,
                 'optimization_metadata': {
-                    'optimization_date': datetime.utcnow().isoformat(),
+                    'optimization_date': datetime.now(timezone.utc).isoformat(),
                     'cognitive_capacity': cognitive_profile['capacity'],
                     'optimization_confidence': current_load_analysis['confidence']
                 }
@@ -262,7 +397,7 @@ class LearningAnalytics:
                 'completion_predictions': completion_predictions,
                 'optimization_opportunities': optimization_opportunities,
                 'velocity_metadata': {
-                    'prediction_date': datetime.utcnow().isoformat(),
+                    'prediction_date': datetime.now(timezone.utc).isoformat(),
                     'historical_data_points': len(velocity_history),
                     'prediction_confidence': velocity_prediction['confidence']
                 }
@@ -443,22 +578,30 @@ class LearningAnalytics:
     
     def _get_comprehensive_user_profile(self, user_id: int) -> Dict[str, Any]:
         """Get comprehensive user profile for analytics"""
-        user = self.db.query(User).filter(User.id == user_id).first()
+        cached_profile = self._profile_cache.get(user_id)
+        if cached_profile is not None:
+            return cached_profile
         
-        # Get performance statistics
-        avg_performance = self.db.query(func.avg(Performance.score)).filter(
+        # Fetch the user together with performance and session statistics in one round-trip
+        avg_score_query = select(func.avg(Performance.score)).where(
             Performance.user_id == user_id
-        ).scalar() or 0.7
-        
-        # Get study session statistics
-        total_sessions = self.db.query(StudySession).filter(
+        ).scalar_subquery()
+        session_count_query = select(func.count(StudySession.id)).where(
             StudySession.user_id == user_id
-        ).count()
+        ).scalar_subquery()
+        
+        row = self._query_precomputed_user_stats(user_id, avg_score_query, session_count_query)
+        if row is None:
+            row = self.db.query(User, avg_score_query, session_count_query).filter(
+                User.id == user_id
+            ).first()
+        user, avg_performance, total_sessions = row if row else (None, None, 0)
+        avg_performance = avg_performance or 0.7
         
         # Calculate experience level
         experience_level = min(1.0, total_sessions / 50.0)  # 50 sessions = experienced
         
-        return {
+        profile = {
             'user_id': user_id,
             'average_performance': avg_performance,
             'total_sessions': total_sessions,
@@ -467,6 +610,39 @@ class LearningAnalytics:
             'retention_rate': getattr(user, 'retention_rate', 0.7) if user else 0.7,
             'cognitive_capacity': getattr(user, 'cognitive_load_limit', 0.8) if user else 0.8
         }
+        self._profile_cache[user_id] = profile
+        return profile
+    
+    def _query_precomputed_user_stats(self, user_id: int, avg_score_query, session_count_query):
+        """
+        Read user aggregates from the mv_user_learning_stats materialized view,
+        falling back to the live subqueries for users added since the last refresh.
+        Returns None when the view is not available (e.g. SQLite development databases).
+        """
+        if LearningAnalytics._user_stats_view_available is None:
+            LearningAnalytics._user_stats_view_available = inspect(self.db.get_bind()).has_table(
+                'mv_user_learning_stats'
+            )
+        if not LearningAnalytics._user_stats_view_available:
+            return None
+        
+        stats_view = table(
+            'mv_user_learning_stats',
+            column('user_id'), column('avg_score'), column('total_sessions')
+        )
+        try:
+            return self.db.query(
+                User,
+                func.coalesce(stats_view.c.avg_score, avg_score_query),
+                func.coalesce(stats_view.c.total_sessions, session_count_query)
+            ).outerjoin(
+                stats_view, stats_view.c.user_id == User.id
+            ).filter(User.id == user_id).first()
+        except DBAPIError as e:
+            # Only a missing view (undefined_table) is permanent; transient errors propagate as-is
+            if getattr(e.orig, 'pgcode', None) == '42P01':
+                LearningAnalytics._user_stats_view_available = False
+            raise
     
     def _predict_initial_learning_metrics(
         self,
@@ -474,32 +650,19 @@ class LearningAnalytics:
         user_profile: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Predict initial learning metrics for new material"""
-        difficulty = content_analysis.get('estimated_difficulty', 0.5)
-        word_count = content_analysis.get('word_count', 1000)
-        
-        # Predict completion time
-        base_time = word_count / user_profile['reading_speed']
-        difficulty_multiplier = 1 + (difficulty * 0.5)
-        experience_adjustment = 1 - (user_profile['experience_level'] * 0.2)
-        completion_time = base_time * difficulty_multiplier * experience_adjustment
-        
-        # Predict retention rate
-        base_retention = user_profile['retention_rate']
-        difficulty_penalty = difficulty * 0.15
-        retention_rate = max(0.5, base_retention - difficulty_penalty)
-        
-        # Predict sessions needed
-        base_sessions = max(3, int(completion_time / 60))  # 1 hour per session
-        sessions_needed = int(base_sessions * (1 + difficulty * 0.3))
-        
-        # Predict difficulty adaptation
-        adaptation_rate = user_profile['experience_level'] * 0.3 + 0.7
+        completion_time, retention_rate, sessions_needed, adaptation_rate = _predict_learning_metrics(
+            content_analysis.get('word_count', 1000),
+            content_analysis.get('estimated_difficulty', 0.5),
+            user_profile['reading_speed'],
+            user_profile['experience_level'],
+            user_profile['retention_rate']
+        )
         
         return {
-            'completion_time': round(completion_time, 1),
-            'retention_rate': round(retention_rate, 3),
+            'completion_time': completion_time,
+            'retention_rate': retention_rate,
             'sessions_needed': sessions_needed,
-            'difficulty_adaptation': round(adaptation_rate, 3)
+            'difficulty_adaptation': adaptation_rate
         }
     
     def _calculate_expected_trajectory(
@@ -509,30 +672,34 @@ class LearningAnalytics:
         predicted_metrics: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Calculate expected learning trajectory"""
-        trajectory = []
         sessions = predicted_metrics['sessions_needed']
+        initial_performance = 0.3 + (user_profile['experience_level'] * 0.2)
+        difficulty = content_analysis.get('estimated_difficulty', 0.5)
         
-        for session in range(1, sessions + 1):
-            # Predict performance for each session
-            progress_factor = session / sessions
-            initial_performance = 0.3 + (user_profile['experience_level'] * 0.2)
-            
-            # Learning curve (exponential improvement with plateau)
-            performance = initial_performance + (0.6 * (1 - math.exp(-progress_factor * 3)))
-            
-            # Adjust for difficulty
-            difficulty = content_analysis.get('estimated_difficulty', 0.5)
-            adjusted_performance = performance * (1 - difficulty * 0.2)
-            
-            trajectory.append({
-                'session_number': session,
-                'expected_performance': round(min(0.9, adjusted_performance), 3),
-                'expected_retention': round(predicted_metrics['retention_rate'] * 
-                                          (0.8 + progress_factor * 0.2), 3),
-                'confidence': round(0.9 - (session * 0.02), 2)  # Decreasing confidence for future
-            })
+        # Predict all sessions at once
+        session_numbers = np.arange(1, sessions + 1)
+        progress_factors = session_numbers / sessions
         
-        return trajectory
+        # Learning curve (exponential improvement with plateau), adjusted for difficulty
+        performance = initial_performance + (0.6 * (1 - np.exp(-progress_factors * 3)))
+        adjusted_performance = np.minimum(0.9, performance * (1 - difficulty * 0.2))
+        expected_retention = predicted_metrics['retention_rate'] * (0.8 + progress_factors * 0.2)
+        confidence = 0.9 - (session_numbers * 0.02)  # Decreasing confidence for future
+        
+        return [
+            {
+                'session_number': session,
+                'expected_performance': round(perf, 3),
+                'expected_retention': round(retention, 3),
+                'confidence': round(conf, 2)
+            }
+            for session, perf, retention, conf in zip(
+                session_numbers.tolist(),
+                adjusted_performance.tolist(),
+                expected_retention.tolist(),
+                confidence.tolist()
+            )
+        ]
     
     def _setup_monitoring_baselines(
         self,
@@ -562,49 +729,51 @@ class LearningAnalytics:
         """Get comprehensive learning data for analysis"""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get performance data
-        performances = self.db.query(Performance).join(Quiz).filter(
-            Performance.user_id == user_id,
-            Quiz.material_id == material_id,
-            Performance.created_at >= cutoff_date
-        ).order_by(Performance.created_at).all()
+        # Get performance data as lightweight column rows (attribute access still works)
+        performances = self.db.execute(
+            select(*_PERFORMANCE_ANALYTICS_COLUMNS).join(Quiz).where(
+                Performance.user_id == user_id,
+                Quiz.material_id == material_id,
+                Performance.created_at >= cutoff_date
+            ).order_by(Performance.created_at)
+        ).all()
         
         # Get study sessions
-        study_sessions = self.db.query(StudySession).join(Schedule).filter(
-            StudySession.user_id == user_id,
-            Schedule.material_id == material_id,
-            StudySession.start_time >= cutoff_date
-        ).order_by(StudySession.start_time).all()
+        study_sessions = self.db.execute(
+            select(*_STUDY_SESSION_ANALYTICS_COLUMNS).join(Schedule).where(
+                StudySession.user_id == user_id,
+                Schedule.material_id == material_id,
+                StudySession.start_time >= cutoff_date
+            ).order_by(StudySession.start_time)
+        ).all()
         
         return {
             'performances': performances,
             'study_sessions': study_sessions,
-            'analysis_period': days
+            'analysis_period': days,
+            'user_id': user_id,
+            'material_id': material_id,
+            'cutoff_date': cutoff_date
         }
     
-    def _analyze_performance_patterns(self, performances: List[Performance]) -> Dict[str, Any]:
+    def _analyze_performance_patterns(self, performances: Sequence[Row]) -> Dict[str, Any]:
         """Analyze performance patterns from quiz data"""
         if not performances:
             return self._get_default_performance_patterns()
         
-        scores = [p.score for p in performances]
-        times = [p.time_taken for p in performances if p.time_taken]
+        count = len(performances)
+        scores = np.fromiter((p.score for p in performances), dtype=_ANALYTICS_DTYPE, count=count)
+        times = np.fromiter((p.time_taken or 0.0 for p in performances), dtype=_ANALYTICS_DTYPE, count=count)
         
-        # Calculate basic statistics
-        avg_score = sum(scores) / len(scores)
-        score_trend = self._calculate_trend(scores)
-        consistency = 1 - (np.std(scores) if len(scores) > 1 else 0)
-        
-        # Analyze improvement rate
-        if len(scores) >= 4:
-            first_half = scores[:len(scores)//2]
-            second_half = scores[len(scores)//2:]
-            improvement_rate = (sum(second_half)/len(second_half)) - (sum(first_half)/len(first_half))
-        else:
-            improvement_rate = 0
+        # Calculate basic statistics and improvement rate
+        avg_score, volatility, improvement_rate, slope = self._score_statistics(scores)
+        score_trend = self._classify_trend(slope)
+        consistency = 1 - volatility
         
-        # Analyze time efficiency
-        time_efficiency = self._analyze_time_efficiency(times, scores)
+        # Analyze time efficiency over the assessments with a recorded time, keeping each
+        # time paired with its own score
+        timed = times != 0
+        time_efficiency = self._analyze_time_efficiency(times[timed].tolist(), scores[timed].tolist())
         
         return {
             'average_score': round(avg_score, 3),
@@ -613,11 +782,32 @@ class LearningAnalytics:
             'improvement_rate': round(improvement_rate, 3),
             'time_efficiency': time_efficiency,
             'total_assessments': len(performances),
-            'performance_volatility': round(np.std(scores) if len(scores) > 1 else 0, 3)
+            'performance_volatility': round(volatility, 3)
         }
     
-    def _analyze_study_behavior_patterns(self, study_sessions: List[StudySession]) -> Dict[str, Any]:
+    def _score_statistics(self, scores: np.ndarray) -> Tuple[float, float, float, float]:
+        """Mean, standard deviation, split-half improvement and trend slope of scores from shared reductions"""
+        count = len(scores)
+        total = float(scores.sum())
+        mean = total / count
+        
+        # Deviations from the mean feed both the variance and the slope
+        deviations = scores - mean
+        std = math.sqrt(float(np.dot(deviations, deviations)) / count) if count > 1 else 0.0
+        slope = self._trend_slope(deviations)
+        
+        # Second-half mean minus first-half mean, reusing the overall total
+        improvement = 0.0
+        if count >= 4:
+            half = count // 2
+            first_total = float(scores[:half].sum())
+            improvement = (total - first_total) / (count - half) - first_total / half
+        
+        return float(mean), float(std), float(improvement), slope
+    
+    def _analyze_study_behavior_patterns(self, learning_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze study behavior patterns"""
+        study_sessions = learning_data['study_sessions']
         if not study_sessions:
             return self._get_default_behavior_patterns()
         
@@ -625,12 +815,15 @@ class LearningAnalytics:
         durations = [s.duration_minutes for s in study_sessions if s.duration_minutes]
         focus_scores = [s.focus_score for s in study_sessions if s.focus_score is not None]
         
-        # Analyze study timing patterns
-        study_times = [s.start_time.hour for s in study_sessions]
-        preferred_time = max(set(study_times), key=study_times.count) if study_times else 9
+        # Analyze study timing patterns: most common start hour, ties broken in the
+        # set's iteration order as with max(set(hours), key=hours.count)
+        start_hours = np.fromiter((s.start_time.hour for s in study_sessions), dtype=np.intp, count=len(study_sessions))
+        sessions_per_hour = np.bincount(start_hours, minlength=24).tolist()
+        preferred_time = max(set(start_hours.tolist()), key=sessions_per_hour.__getitem__)
         
         # Calculate engagement metrics
-        avg_duration = sum(durations) / len(durations) if durations else 0
+        total_study_time = sum(durations)
+        avg_duration = total_study_time / len(durations) if durations else 0
         avg_focus = sum(focus_scores) / len(focus_scores) if focus_scores else 0.5
         
         # Analyze consistency
@@ -641,7 +834,7 @@ class LearningAnalytics:
             'average_focus_score': round(avg_focus, 3),
             'preferred_study_time': preferred_time,
             'session_consistency': session_consistency,
-            'total_study_time': sum(durations),
+            'total_study_time': total_study_time,
             'total_sessions': len(study_sessions),
             'engagement_level': self._calculate_engagement_level(focus_scores, durations)
         }
@@ -651,32 +844,41 @@ class LearningAnalytics:
         performances = learning_data['performances']
         study_sessions = learning_data['study_sessions']
         
-        # Analyze learning by day of week
-        weekday_performance = defaultdict(list)
-        for p in performances:
-            weekday = p.created_at.weekday()
-            weekday_performance[weekday].append(p.score)
+        count = len(performances)
+        scores = np.fromiter((p.score for p in performances), dtype=np.float64, count=count)
+        weekdays = np.fromiter((p.created_at.weekday() for p in performances), dtype=np.intp, count=count)
+        hours = np.fromiter((p.created_at.hour for p in performances), dtype=np.intp, count=count)
         
-        # Analyze learning by time of day
-        hour_performance = defaultdict(list)
-        for p in performances:
-            hour = p.created_at.hour
-            hour_performance[hour].append(p.score)
-        
-        # Find optimal learning times
-        best_weekday = max(weekday_performance.items(), 
-                          key=lambda x: sum(x[1])/len(x[1]) if x[1] else 0)[0] if weekday_performance else 1
-        best_hour = max(hour_performance.items(),
-                       key=lambda x: sum(x[1])/len(x[1]) if x[1] else 0)[0] if hour_performance else 9
+        # Find optimal learning times by day of week and time of day
+        best_weekday = self._best_bucket(weekdays, scores, 7, default=1)
+        best_hour = self._best_bucket(hours, scores, 24, default=9)
         
         return {
             'best_weekday': best_weekday,
             'best_hour': best_hour,
-            'weekday_patterns': dict(weekday_performance),
-            'hourly_patterns': dict(hour_performance),
+            'weekday_patterns': self._bucket_scores(weekdays, scores),
+            'hourly_patterns': self._bucket_scores(hours, scores),
             'learning_rhythm': self._identify_learning_rhythm(performances, study_sessions)
         }
     
+    def _bucket_scores(self, buckets: np.ndarray, scores: np.ndarray) -> Dict[int, List[float]]:
+        """Scores grouped by bucket, buckets in order of first appearance"""
+        _, first_seen = np.unique(buckets, return_index=True)
+        return {
+            int(bucket): scores[buckets == bucket].tolist()
+            for bucket in buckets[np.sort(first_seen)]
+        }
+    
+    def _best_bucket(self, buckets: np.ndarray, scores: np.ndarray, size: int, default: int) -> int:
+        """Return the bucket with the highest average score; ties go to the bucket seen first"""
+        if not len(buckets):
+            return default
+        
+        totals = np.bincount(buckets, weights=scores, minlength=size)
+        counts = np.bincount(buckets, minlength=size)
+        means = np.divide(totals, counts, out=np.full(size, -np.inf), where=counts > 0)
+        return int(buckets[np.argmax(means[buckets] == means.max())])
+    
     def _calculate_learning_efficiency(self, learning_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate learning efficiency metrics"""
         performances = learning_data['performances']
@@ -694,13 +896,12 @@ class LearningAnalytics:
         else:
             efficiency_score = 0
         
-        # Calculate time to competency (score > 0.7)
-        competent_performances = [p for p in performances if p.score >= 0.7]
+        # Calculate time to competency (score > 0.7); rows arrive in time order, so the
+        # first competent performance and the first session are the earliest ones
+        first_competent = next((p.created_at for p in performances if p.score >= 0.7), None)
         time_to_competency = 0
-        if competent_performances:
-            first_competent = min(competent_performances, key=lambda x: x.created_at)
-            first_session = min(study_sessions, key=lambda x: x.start_time)
-            time_to_competency = (first_competent.created_at - first_session.start_time).days
+        if first_competent is not None:
+            time_to_competency = (first_competent - study_sessions[0].start_time).days
         
         return {
             'efficiency_score': round(min(efficiency_score, 2.0), 3),  # Cap at 2.0
@@ -719,32 +920,21 @@ class LearningAnalytics:
         strengths = []
         weaknesses = []
         
-        # Analyze performance strengths/weaknesses
-        if performance_patterns['average_score'] >= 0.8:
-            strengths.append('High performance consistency')
-        elif performance_patterns['average_score'] < 0.6:
-            weaknesses.append('Below average performance')
-        
-        if performance_patterns['improvement_rate'] > 0.1:
-            strengths.append('Strong learning progression')
-        elif performance_patterns['improvement_rate'] < -0.05:
-            weaknesses.append('Declining performance trend')
-        
-        if performance_patterns['consistency_score'] > 0.8:
-            strengths.append('Consistent performance')
-        elif performance_patterns['consistency_score'] < 0.6:
-            weaknesses.append('Inconsistent performance')
-        
-        # Analyze behavior strengths/weaknesses
-        if behavior_patterns['average_focus_score'] > 0.7:
-            strengths.append('High focus and attention')
-        elif behavior_patterns['average_focus_score'] < 0.5:
-            weaknesses.append('Attention and focus challenges')
-        
-        if behavior_patterns['session_consistency']['consistency_score'] > 0.7:
-            strengths.append('Regular study habits')
-        elif behavior_patterns['session_consistency']['consistency_score'] < 0.5:
-            weaknesses.append('Irregular study schedule')
+        # Performance and behavior values in the order of _STRENGTH_WEAKNESS_RULES
+        average_focus, session_consistency = _get_behavior_fields(behavior_patterns)
+        values = (
+            *_get_performance_fields(performance_patterns),
+            average_focus,
+            session_consistency['consistency_score']
+        )
+        
+        for value, (is_strong, strong_threshold, strength, weak_threshold, weakness) in zip(
+            values, _STRENGTH_WEAKNESS_RULES
+        ):
+            if is_strong(value, strong_threshold):
+                strengths.append(strength)
+            elif value < weak_threshold:
+                weaknesses.append(weakness)
         
         return {
             'strengths': strengths,
@@ -759,20 +949,15 @@ class LearningAnalytics:
         material_id: int
     ) -> Dict[str, Any]:
         """Predict optimal difficulty progression"""
-        current_performance = performance_patterns['average_score']
-        improvement_rate = performance_patterns['improvement_rate']
-        consistency = performance_patterns['consistency_score']
-        
-        # Calculate optimal difficulty
-        if current_performance >= 0.8 and consistency > 0.7:
-            recommended_difficulty = 'increase'
-            target_difficulty = min(1.0, 0.7 + current_performance * 0.3)
-        elif current_performance < 0.6 or consistency < 0.5:
-            recommended_difficulty = 'decrease'
-            target_difficulty = max(0.3, current_performance * 0.8)
-        else:
-            recommended_difficulty = 'maintain'
-            target_difficulty = 0.5 + current_performance * 0.2
+        current_performance, improvement_rate, consistency = _get_performance_fields(performance_patterns)
+        
+        # Calculate optimal difficulty; the two cases are mutually exclusive
+        case_index = (
+            (current_performance >= 0.8 and consistency > 0.7) * 2
+            + (current_performance < 0.6 or consistency < 0.5)
+        )
+        recommended_difficulty, base, weight, lower, upper = _DIFFICULTY_PROGRESSION_TABLE[case_index]
+        target_difficulty = min(upper, max(lower, base + current_performance * weight))
         
         return {
             'current_optimal_difficulty': round(target_difficulty, 2),
@@ -789,14 +974,12 @@ class LearningAnalytics:
     ) -> Dict[str, Any]:
         """Calculate overall learning health score"""
         # Weight different components
-        performance_weight = 0.4
-        behavior_weight = 0.3
-        efficiency_weight = 0.3
+        performance_weight, behavior_weight, efficiency_weight = _HEALTH_WEIGHTS
         
         # Normalize scores to 0-1 range
         performance_score = performance_patterns['average_score']
-        behavior_score = (behavior_patterns['average_focus_score'] + 
-                         behavior_patterns['session_consistency']['consistency_score']) / 2
+        average_focus, session_consistency = _get_behavior_fields(behavior_patterns)
+        behavior_score = (average_focus + session_consistency['consistency_score']) / 2
         efficiency_score = min(1.0, efficiency_metrics['efficiency_score'] / 2.0)
         
         # Calculate weighted health score
@@ -805,14 +988,7 @@ class LearningAnalytics:
                        efficiency_score * efficiency_weight)
         
         # Determine health category
-        if health_score >= 0.8:
-            health_category = 'excellent'
-        elif health_score >= 0.7:
-            health_category = 'good'
-        elif health_score >= 0.6:
-            health_category = 'fair'
-        else:
-            health_category = 'needs_improvement'
+        health_category = _HEALTH_CATEGORIES[bisect_right(_HEALTH_THRESHOLDS, health_score)]
         
         return {
             'overall_score': round(health_score, 3),
@@ -830,72 +1006,44 @@ class LearningAnalytics:
     
     def _get_default_learning_profile(self) -> Dict[str, Any]:
         """Return default learning profile for new users"""
-        return {
-            'reading_speed': 200,
-            'current_level': 0.5,
-            'difficulty_tolerance': 0.5,
-            'cognitive_profile': {
-                'capacity': 0.8,
-                'attention_span': 45,
-                'processing_speed': 0.7
-            }
-        }
+        return _to_plain_dict(self._DEFAULT_LEARNING_PROFILE)
     
     def _calculate_analysis_confidence(self, learning_data: Dict[str, Any]) -> float:
         """Calculate confidence in analysis based on data quality"""
-        performances = learning_data['performances']
-        study_sessions = learning_data['study_sessions']
-        
-        data_points = len(performances) + len(study_sessions)
-        if data_points >= 10:
-            return 0.9
-        elif data_points >= 5:
-            return 0.7
-        elif data_points >= 2:
-            return 0.5
-        else:
-            return 0.3
+        return self._confidence_for_data_points(
+            len(learning_data['performances']) + len(learning_data['study_sessions'])
+        )
+    
+    @staticmethod
+    def _confidence_for_data_points(data_points: int) -> float:
+        """Analysis confidence for callers that already know the data point count"""
+        return _CONFIDENCE_VALUES[bisect_right(_CONFIDENCE_THRESHOLDS, data_points)]
     
     def _get_default_performance_patterns(self) -> Dict[str, Any]:
         """Return default performance patterns"""
-        return {
-            'average_score': 0.5,
-            'score_trend': 'stable',
-            'consistency_score': 0.5,
-            'improvement_rate': 0.0,
-            'time_efficiency': {'efficiency_score': 0.5},
-            'total_assessments': 0,
-            'performance_volatility': 0.0
-        }
+        return _to_plain_dict(self._DEFAULT_PERFORMANCE_PATTERNS)
     
     def _get_default_behavior_patterns(self) -> Dict[str, Any]:
         """Return default behavior patterns"""
-        return {
-            'average_session_duration': 30,
-            'average_focus_score': 0.5,
-            'preferred_study_time': 9,
-            'session_consistency': {'consistency_score': 0.5},
-            'total_study_time': 0,
-            'total_sessions': 0,
-            'engagement_level': 0.5
-        }
+        return _to_plain_dict(self._DEFAULT_BEHAVIOR_PATTERNS)
     
-    def _calculate_trend(self, values: List[float]) -> str:
+    def _calculate_trend(self, values: Sequence[float]) -> str:
         """Calculate trend direction from a list of values"""
-        if len(values) < 3:
-            return 'stable'
-        
-        # Simple linear trend calculation
-        x = list(range(len(values)))
-        n = len(values)
-        
-        sum_x = sum(x)
-        sum_y = sum(values)
-        sum_xy = sum(x[i] * values[i] for i in range(n))
-        sum_x2 = sum(x[i] ** 2 for i in range(n))
-        
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2)
+        y = np.asarray(values, dtype=np.float64)
+        return self._classify_trend(self._trend_slope(y - y.mean()) if len(y) else 0.0)
+    
+    def _trend_slope(self, deviations: np.ndarray) -> float:
+        """Least-squares slope against x = 0..n-1 from deviations about the mean (0 below 3 points)"""
+        n = len(deviations)
+        if n < 3:
+            return 0.0
         
+        # The x variance has the closed form n(n^2 - 1)/12
+        x_centered = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+        return float(np.dot(x_centered, deviations)) / (n * (n * n - 1) / 12.0)
+    
+    def _classify_trend(self, slope: float) -> str:
+        """Map a trend slope to improving/declining/stable"""
         if slope > 0.05:
             return 'improving'
         elif slope < -0.05:
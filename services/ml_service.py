@@ -3,15 +3,56 @@ Main ML Service for orchestrating all machine learning operations
 Implements the ML pipeline described in the system architecture
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
 import math
+import time
+import threading
 import numpy as np
 from sqlalchemy.orm import Session
-from .document_processor import DocumentProcessor
-from .quiz_generator import QuizGenerator  
-from .spaced_repetition_scheduler import SpacedRepetitionScheduler
-from .learning_analytics import LearningAnalytics
+
+# Constant response metadata, shared across responses
+_PIPELINE_STAGES = ('document_processing', 'content_analysis', 'quiz_generation', 'hlr_scheduling', 'analytics_init')
+_OPTIMIZATION_FACTORS = ('content_difficulty', 'cognitive_load', 'time_constraints', 'user_preferences')
+
+# Response timestamps share their date/time prefix within a second; format it once per second.
+# The (second, prefix) pair is replaced as a whole under the lock, so readers never see a torn pair
+_iso_second_cache: Tuple[int, str] = (-1, '')
+_iso_second_lock = threading.Lock()
+
+def _iso_now() -> str:
+    """Current UTC time as a naive ISO string, matching datetime.utcnow().isoformat()"""
+    global _iso_second_cache
+    second, microsecond = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _iso_second_cache
+    if cached_second != second:
+        prefix = datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None).isoformat()
+        with _iso_second_lock:
+            _iso_second_cache = (second, prefix)
+    return f'{prefix}.{microsecond:06d}' if microsecond else prefix
+
+@lru_cache(maxsize=128)
+def _compute_optimal_breaks(available_time: int) -> Tuple[Dict[str, Any], ...]:
+    """Break plan for a session length; depends only on the available minutes"""
+    breaks = []
+    
+    # Use research-based break intervals (Pomodoro technique with adaptations)
+    if available_time >= 60:  # For sessions 1 hour or longer
+        break_intervals = (25, 50, 75)  # Every 25 minutes
+        for interval in break_intervals:
+            if interval < available_time - 10:
+                breaks.append({
+                    'time': interval,
+                    'duration': 5 if interval != 50 else 10,  # Longer break at halfway point
+                    'type': 'cognitive_refresh'
+                })
+    
+    return tuple(breaks)
+
+def _as_minutes(values: np.ndarray, is_float: np.ndarray) -> List[Any]:
+    """Timeline minutes as Python numbers: int unless a float duration was added into them"""
+    return [value if float_value else int(value) for value, float_value in zip(values.tolist(), is_float.tolist())]
 
 class MLService:
     """
@@ -21,10 +62,39 @@ class MLService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.document_processor = DocumentProcessor()
-        self.quiz_generator = QuizGenerator(db)
-        self.scheduler = SpacedRepetitionScheduler(db)
-        self.analytics = LearningAnalytics(db)
+        # Component services (and their pypdf/NLP imports) load on first use
+        self._document_processor = None
+        self._quiz_generator = None
+        self._scheduler = None
+        self._analytics = None
+    
+    @property
+    def document_processor(self):
+        if self._document_processor is None:
+            from .document_processor import DocumentProcessor
+            self._document_processor = DocumentProcessor()
+        return self._document_processor
+    
+    @property
+    def quiz_generator(self):
+        if self._quiz_generator is None:
+            from .quiz_generator import QuizGenerator
+            self._quiz_generator = QuizGenerator(self.db)
+        return self._quiz_generator
+    
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            from .spaced_repetition_scheduler import SpacedRepetitionScheduler
+            self._scheduler = SpacedRepetitionScheduler(self.db)
+        return self._scheduler
+    
+    @property
+    def analytics(self):
+        if self._analytics is None:
+            from .learning_analytics import LearningAnalytics
+            self._analytics = LearningAnalytics(self.db)
+        return self._analytics
     
     def process_learning_material(
         self,
@@ -51,10 +121,11 @@ class MLService:
             if not doc_result['success']:
                 return doc_result
             
-            # Step 2: Content Analysis and Segmentation
-            content_analysis = self.document_processor.analyze_content_structure(
-                doc_result['full_text']
-            )
+            # Step 2: Content Analysis and Segmentation (already computed by the pipeline)
+            content_analysis = doc_result['structure_analysis']
+            
+            if not target_completion_date:
+                target_completion_date = datetime.utcnow() + timedelta(days=14)
             
             # Step 3: Generate Initial Assessment Quiz
             initial_quiz = self.quiz_generator.generate_adaptive_quiz(
@@ -65,9 +136,6 @@ class MLService:
             )
             
             # Step 4: Create Personalized Study Schedule using HLR
-            if not target_completion_date:
-                target_completion_date = datetime.utcnow() + timedelta(days=14)
-                
             schedule = self.scheduler.generate_hlr_schedule(
                 user_id=user_id,
                 content_analysis=content_analysis,
@@ -88,9 +156,9 @@ class MLService:
                 'study_schedule': schedule,
                 'baseline_metrics': baseline_metrics,
                 'processing_metadata': {
-                    'processed_at': datetime.utcnow().isoformat(),
+                    'processed_at': _iso_now(),
                     'ml_version': '1.0',
-                    'pipeline_stages': ['document_processing', 'content_analysis', 'quiz_generation', 'hlr_scheduling', 'analytics_init']
+                    'pipeline_stages': _PIPELINE_STAGES
                 }
             }
             
@@ -163,7 +231,7 @@ class MLService:
                     'cognitive_load_adjustments': cognitive_load_adjustment
                 },
                 'adaptation_metadata': {
-                    'adapted_at': datetime.utcnow().isoformat(),
+                    'adapted_at': _iso_now(),
                     'adaptation_trigger': 'performance_feedback',
                     'confidence_score': performance_analysis.get('confidence_score', 0.7)
                 }
@@ -240,7 +308,7 @@ class MLService:
                 'recommendations': recommendations,
                 'prediction_metadata': {
                     'model_version': '1.0',
-                    'prediction_date': datetime.utcnow().isoformat(),
+                    'prediction_date': _iso_now(),
                     'confidence_interval': '95%',
                     'time_horizon_days': time_horizon_days
                 }
@@ -317,8 +385,8 @@ class MLService:
                     'break_recommendations': self._calculate_optimal_breaks(available_time_minutes)
                 },
                 'optimization_metadata': {
-                    'optimized_at': datetime.utcnow().isoformat(),
-                    'optimization_factors': ['content_difficulty', 'cognitive_load', 'time_constraints', 'user_preferences']
+                    'optimized_at': _iso_now(),
+                    'optimization_factors': _OPTIMIZATION_FACTORS
                 }
             }
             
@@ -393,58 +461,70 @@ class MLService:
         cognitive_optimization: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Create an adaptive timeline for the study session"""
-        timeline = []
-        current_time = 0
+        num_sections = len(content_sections)
+        if num_sections == 0:
+            return []
         
-        for i, section in enumerate(content_sections):
-            # Add content study block
-            study_duration = min(section['estimated_time'], 
-                               cognitive_optimization['max_focus_duration'])
-            
+        max_focus = cognitive_optimization['max_focus_duration']
+        break_duration = cognitive_optimization.get('recommended_break_duration', 5)
+        study_durations = [min(section['estimated_time'], max_focus) for section in content_sections]
+        has_quiz = np.arange(num_sections) < len(quizzes)
+        
+        # Each section contributes (study, quiz, break) minutes; a flat cumsum adds them
+        # one at a time, in order, so totals match a running sum exactly
+        terms = np.zeros((num_sections, 3))
+        terms[:, 0] = study_durations
+        terms[:, 1] = np.where(has_quiz, 5, 0)  # 5 minutes per quiz
+        terms[:-1, 2] = break_duration
+        
+        # Breaks are taken while time remains, so they always form a prefix of the sections
+        elapsed = np.cumsum(terms).reshape(num_sections, 3)
+        takes_break = np.logical_and.accumulate(elapsed[:, 1] < available_time - 10)
+        takes_break[-1] = False
+        terms[:, 2] = np.where(takes_break, terms[:, 2], 0)
+        ends = np.cumsum(terms).reshape(num_sections, 3)
+        
+        # Minutes stay ints until a float duration has been added, as with Python arithmetic
+        term_is_float = np.zeros((num_sections, 3), dtype=bool)
+        term_is_float[:, 0] = [isinstance(duration, float) for duration in study_durations]
+        term_is_float[:, 2] = takes_break & isinstance(break_duration, float)
+        ends_are_float = np.logical_or.accumulate(term_is_float.ravel()).reshape(num_sections, 3)
+        
+        starts = [0] + _as_minutes(ends[:-1, 2], ends_are_float[:-1, 2])
+        study_ends = _as_minutes(ends[:, 0], ends_are_float[:, 0])
+        block_ends = _as_minutes(ends[:, 1], ends_are_float[:, 1])
+        
+        timeline = []
+        for i, (section, start, duration, study_end, block_end, quiz_slot, has_break) in enumerate(zip(
+            content_sections, starts, study_durations, study_ends, block_ends,
+            has_quiz.tolist(), takes_break.tolist()
+        )):
             timeline.append({
                 'type': 'study',
-                'start_time': current_time,
-                'duration': study_duration,
+                'start_time': start,
+                'duration': duration,
                 'content': section,
                 'cognitive_load': section.get('difficulty_score', 0.5)
             })
-            current_time += study_duration
             
-            # Add quiz if available
-            if i < len(quizzes):
+            if quiz_slot:
                 timeline.append({
                     'type': 'assessment',
-                    'start_time': current_time,
-                    'duration': 5,  # 5 minutes for quiz
+                    'start_time': study_end,
+                    'duration': 5,
                     'quiz': quizzes[i]
                 })
-                current_time += 5
             
-            # Add break if needed
-            if current_time < available_time - 10 and i < len(content_sections) - 1:
-                break_duration = cognitive_optimization.get('recommended_break_duration', 5)
+            if has_break:
                 timeline.append({
                     'type': 'break',
-                    'start_time': current_time,
+                    'start_time': block_end,
                     'duration': break_duration
                 })
-                current_time += break_duration
         
         return timeline
     
     def _calculate_optimal_breaks(self, available_time: int) -> List[Dict[str, Any]]:
         """Calculate optimal break intervals for the session"""
-        breaks = []
-        
-        # Use research-based break intervals (Pomodoro technique with adaptations)
-        if available_time >= 60:  # For sessions 1 hour or longer
-            break_intervals = [25, 50, 75]  # Every 25 minutes
-            for interval in break_intervals:
-                if interval < available_time - 10:
-                    breaks.append({
-                        'time': interval,
-                        'duration': 5 if interval != 50 else 10,  # Longer break at halfway point
-                        'type': 'cognitive_refresh'
-                    })
-        
-        return breaks
\ No newline at end of file
+        # Hand out copies so callers never mutate the cached plan
+        return [dict(session_break) for session_break in _compute_optimal_breaks(available_time)]
\ No newline at end of file
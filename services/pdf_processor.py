@@ -1,12 +1,195 @@
 import pypdf as PyPDF2
 import os
 import re
-from typing import Dict, Any, Optional, List
+import copy
+import logging
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from io import BytesIO
+import numpy as np
+from config import settings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from bisect import bisect_right
+
+logger = logging.getLogger(__name__)
+
+# Smaller documents are extracted in-process; worker startup and re-parsing would dominate
+_PARALLEL_MIN_PAGES = 16
+_MAX_EXTRACT_WORKERS = min(os.cpu_count() or 1, 8)
+
+# A non-blank sentence: text between terminators containing a non-whitespace character.
+# Matches start at that character, so blank stretches between terminators never match
+_SENTENCE_RE = re.compile(r'[^.!?\s][^.!?]*')
+
+# Flesch score band lower bounds (inclusive) and their difficulty, from very difficult
+# (below 30) through difficult, fairly difficult, standard, fairly easy, easy to very easy
+_FLESCH_THRESHOLDS = (30, 50, 60, 70, 80, 90)
+_FLESCH_DIFFICULTY_LEVELS = (0.9, 0.7, 0.5, 0.4, 0.3, 0.2, 0.1)
+
+# Each run of vowels counts as one syllable
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+
+# Byte lookup tables for ASCII text: str.split() whitespace and vowels of either case
+_ASCII_WHITESPACE = np.array([chr(code).isspace() for code in range(256)], dtype=bool) & (np.arange(256) < 128)
+_ASCII_VOWELS = np.zeros(256, dtype=bool)
+_ASCII_VOWELS[list(b'aeiouyAEIOUY')] = True
+
+def _ascii_word_metrics(text: str, sample_threshold: int) -> Tuple[int, int, int, int, int]:
+    """
+    Vectorized equivalent of PDFProcessor._word_metrics for ASCII text
+    
+    Works on the raw bytes: words are runs of non-whitespace, syllables are
+    vowel runs per word, less one for a trailing 'e', with at least one per word.
+    """
+    data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    in_word = ~_ASCII_WHITESPACE[data]
+    
+    # Word boundaries from the edges of the padded in-word mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], in_word.view(np.int8), [0]))))
+    starts, ends = edges[::2], edges[1::2]
+    word_count = len(starts)
+    if word_count == 0:
+        return 0, 0, 0, 0, 0
+    
+    # Same deterministic stride sample as the Python path
+    if word_count > sample_threshold:
+        stride = word_count // sample_threshold
+        starts, ends = starts[::stride], ends[::stride]
+    lengths = ends - starts
+    
+    # Whitespace is never a vowel, so vowel runs never span words; count runs per word
+    # as differences of the running run-start count
+    is_vowel = _ASCII_VOWELS[data]
+    run_starts = is_vowel.copy()
+    run_starts[1:] &= ~is_vowel[:-1]
+    run_count = np.concatenate(([0], np.cumsum(run_starts, dtype=np.int64)))
+    syllables = run_count[ends] - run_count[starts]
+    syllables -= (data[ends - 1] | 0x20) == ord('e')
+    
+    return (
+        word_count,
+        len(starts),
+        int(lengths.sum()),
+        int(np.count_nonzero(lengths > 6)),
+        int(np.maximum(syllables, 1).sum())
+    )
+
+def _page_entry(page_text: str, page_num: int) -> Dict[str, Any]:
+    """page_texts entry for successfully extracted page text"""
+    return {
+        'page_number': page_num + 1,
+        'text': page_text,
+        'word_count': len(page_text.split()) if page_text else 0
+    }
+
+def _extract_page_entry(page, page_num: int) -> Dict[str, Any]:
+    """Extract one page into its page_texts entry, recording any extraction error"""
+    try:
+        return _page_entry(page.extract_text(), page_num)
+    except Exception as e:
+        logger.warning("Error extracting text from page %d: %s", page_num + 1, e)
+        return {
+            'page_number': page_num + 1,
+            'text': '',
+            'word_count': 0,
+            'error': str(e)
+        }
+
+def _extract_page_range(file_bytes: bytes, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Worker entry point: extract pages [start, stop) with a reader of its own"""
+    pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
+    return [_extract_page_entry(pdf_reader.pages[page_num], page_num) for page_num in range(start, stop)]
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for PDF worker pools: forkserver, or spawn where unavailable, never fork.
+    Forking the threaded API process can hand a child a copy of a lock another thread
+    held (e.g. logging's) that never unlocks
+    """
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(start_method)
+
+# Page-range workers are started once and shared by all uploads
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_lock = threading.Lock()
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Return the shared page extraction pool, starting it on first use"""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=_MAX_EXTRACT_WORKERS, mp_context=_worker_context())
+        return _extract_pool
+
+def _discard_extract_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next upload starts a fresh one"""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is pool:
+            _extract_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _init_batch_worker() -> None:
+    """Batch workers already run one document per core; keep their page extraction in-process"""
+    global _MAX_EXTRACT_WORKERS
+    _MAX_EXTRACT_WORKERS = 1
+
+def _pypdfium2_page_texts(file_bytes: bytes) -> List[str]:
+    """Page texts via pypdfium2 (PDFium, native code)"""
+    import pypdfium2
+    
+    pdf = pypdfium2.PdfDocument(file_bytes)
+    try:
+        page_texts = []
+        for page in pdf:
+            text_page = page.get_textpage()
+            # PDFium separates lines with CRLF; normalize to pypdf's LF so paragraph splitting works
+            page_texts.append(text_page.get_text_range().replace('\r\n', '\n'))
+            text_page.close()
+            page.close()
+        return page_texts
+    finally:
+        pdf.close()
+
+def _pymupdf_page_texts(file_bytes: bytes) -> List[str]:
+    """Page texts via PyMuPDF (MuPDF, native code)"""
+    import fitz
+    
+    with fitz.open(stream=file_bytes, filetype='pdf') as document:
+        return [page.get_text('text') for page in document]
+
+# Optional native extraction backends selectable with NEUROPACE_PDF_BACKEND; pypdf is the default
+_NATIVE_BACKENDS = {
+    'pypdfium2': _pypdfium2_page_texts,
+    'pymupdf': _pymupdf_page_texts
+}
 
 class PDFProcessor:
     """Service for processing PDF files and extracting text content"""
     
+    # Above this many words, difficulty word statistics use a fixed-stride sample
+    DIFFICULTY_SAMPLE_THRESHOLD = 20000
+    
+    # Extraction results keyed by (content digest, filename); re-uploads skip parsing
+    _result_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+    _result_cache_lock = threading.Lock()
+    _result_cache_size = 32
+    
+    # Section splits keyed by (text digest, max section words); materials are re-split per request
+    _sections_cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+    _sections_cache_lock = threading.Lock()
+    _sections_cache_size = 64
+    
+    # Difficulty scores keyed by text digest
+    _difficulty_cache: "OrderedDict[bytes, float]" = OrderedDict()
+    _difficulty_cache_lock = threading.Lock()
+    _difficulty_cache_size = 1024
+    
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> Dict[str, Any]:
         """
@@ -19,64 +202,9 @@ class PDFProcessor:
             Dictionary containing extracted text and metadata
         """
         try:
+            # pypdf seeks heavily; parse from memory rather than the file handle
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extract metadata
-                metadata = {
-                    'total_pages': len(pdf_reader.pages),
-                    'title': '',
-                    'author': '',
-                    'subject': ''
-                }
-                
-                # Get document info if available
-                if pdf_reader.metadata:
-                    metadata.update({
-                        'title': pdf_reader.metadata.get('/Title', ''),
-                        'author': pdf_reader.metadata.get('/Author', ''),
-                        'subject': pdf_reader.metadata.get('/Subject', '')
-                    })
-                
-                # Extract text from all pages
-                full_text = ""
-                page_texts = []
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        page_texts.append({
-                            'page_number': page_num + 1,
-                            'text': page_text,
-                            'word_count': len(page_text.split()) if page_text else 0
-                        })
-                        full_text += page_text + "\n"
-                    except Exception as e:
-                        print(f"Error extracting text from page {page_num + 1}: {e}")
-                        page_texts.append({
-                            'page_number': page_num + 1,
-                            'text': '',
-                            'word_count': 0,
-                            'error': str(e)
-                        })
-                
-                # Calculate statistics
-                word_count = len(full_text.split()) if full_text else 0
-                char_count = len(full_text)
-                
-                return {
-                    'success': True,
-                    'full_text': full_text,
-                    'page_texts': page_texts,
-                    'metadata': metadata,
-                    'statistics': {
-                        'word_count': word_count,
-                        'char_count': char_count,
-                        'estimated_reading_time': PDFProcessor.estimate_reading_time(word_count),
-                        'difficulty_score': PDFProcessor.estimate_difficulty(full_text)
-                    }
-                }
-                
+                file_bytes = file.read()
         except Exception as e:
             return {
                 'success': False,
@@ -89,6 +217,31 @@ class PDFProcessor:
                     'difficulty_score': 0.5
                 }
             }
+        
+        return PDFProcessor.extract_text_from_bytes(file_bytes, os.path.basename(file_path))
+    
+    @staticmethod
+    def extract_batch(paths: List[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Extract text from many PDF files in parallel worker processes
+        
+        Args:
+            paths: Paths to the PDF files
+            workers: Number of worker processes (default: CPU count)
+            
+        Returns:
+            Extraction results in the same order as paths
+        """
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        if workers <= 1:
+            return [PDFProcessor.extract_text_from_pdf(path) for path in paths]
+        
+        # Batch a few files per task to amortize IPC on large corpora
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_worker_context(), initializer=_init_batch_worker
+        ) as executor:
+            return list(executor.map(PDFProcessor.extract_text_from_pdf, paths, chunksize=chunksize))
     
     @staticmethod
     def extract_text_from_bytes(file_bytes: bytes, filename: str) -> Dict[str, Any]:
@@ -102,6 +255,25 @@ class PDFProcessor:
         Returns:
             Dictionary containing extracted text and metadata
         """
+        cache_key = (hashlib.blake2b(file_bytes, digest_size=32).digest(), filename)
+        with PDFProcessor._result_cache_lock:
+            cached = PDFProcessor._result_cache.get(cache_key)
+            if cached is not None:
+                PDFProcessor._result_cache.move_to_end(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        result = PDFProcessor._extract_text_from_bytes_uncached(file_bytes, filename)
+        if result['success']:
+            with PDFProcessor._result_cache_lock:
+                PDFProcessor._result_cache[cache_key] = copy.deepcopy(result)
+                if len(PDFProcessor._result_cache) > PDFProcessor._result_cache_size:
+                    PDFProcessor._result_cache.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _extract_text_from_bytes_uncached(file_bytes: bytes, filename: str) -> Dict[str, Any]:
+        """Extract text content from PDF bytes without consulting the result cache"""
         try:
             pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
             
@@ -123,29 +295,13 @@ class PDFProcessor:
                 })
             
             # Extract text from all pages
-            full_text = ""
-            page_texts = []
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    page_texts.append({
-                        'page_number': page_num + 1,
-                        'text': page_text,
-                        'word_count': len(page_text.split()) if page_text else 0
-                    })
-                    full_text += page_text + "\n"
-                except Exception as e:
-                    print(f"Error extracting text from page {page_num + 1}: {e}")
-                    page_texts.append({
-                        'page_number': page_num + 1,
-                        'text': '',
-                        'word_count': 0,
-                        'error': str(e)
-                    })
+            page_texts = PDFProcessor._extract_page_texts(pdf_reader, file_bytes)
+            parts = [entry['text'] for entry in page_texts if 'error' not in entry]
+            full_text = "\n".join(parts) + "\n" if parts else ""
             
             # Calculate statistics
-            word_count = len(full_text.split()) if full_text else 0
+            # Pages are newline-joined, so per-page word counts add up to the full count
+            word_count = sum(entry['word_count'] for entry in page_texts)
             char_count = len(full_text)
             
             return {
@@ -174,6 +330,141 @@ class PDFProcessor:
                 }
             }
     
+    @staticmethod
+    def extract_text_streaming(file_path: str, out_path: str) -> Dict[str, Any]:
+        """
+        Extract text from a PDF file page by page straight into a UTF-8 text file
+        
+        Only one page's text is held in memory during extraction; page entries
+        carry byte offsets into the output file instead of the text itself.
+        The output file has the same layout as full_text.
+        
+        Args:
+            file_path: Path to the PDF file
+            out_path: Path of the text file to write
+            
+        Returns:
+            Dictionary containing page offsets, metadata and statistics
+        """
+        try:
+            with open(file_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                
+                # Extract metadata
+                metadata = {
+                    'total_pages': len(pdf_reader.pages),
+                    'title': '',
+                    'author': '',
+                    'subject': ''
+                }
+                
+                # Get document info if available
+                if pdf_reader.metadata:
+                    metadata.update({
+                        'title': pdf_reader.metadata.get('/Title', ''),
+                        'author': pdf_reader.metadata.get('/Author', ''),
+                        'subject': pdf_reader.metadata.get('/Subject', '')
+                    })
+                
+                # Write each page as it is extracted
+                page_texts = []
+                word_count = 0
+                char_count = 0
+                with open(out_path, 'wb') as out:
+                    for page_num, page in enumerate(pdf_reader.pages):
+                        entry = _extract_page_entry(page, page_num)
+                        page_text = entry.pop('text')
+                        if 'error' not in entry:
+                            encoded = page_text.encode('utf-8')
+                            entry['byte_offset'] = out.tell()
+                            entry['byte_length'] = len(encoded)
+                            out.write(encoded)
+                            out.write(b"\n")
+                            word_count += entry['word_count']
+                            char_count += len(page_text) + 1
+                        page_texts.append(entry)
+            
+            # Difficulty needs cross-page sentences; this is the only full copy of the text
+            with open(out_path, 'r', encoding='utf-8') as text_file:
+                difficulty_score = PDFProcessor.estimate_difficulty(text_file.read())
+            
+            return {
+                'success': True,
+                'output_path': out_path,
+                'page_texts': page_texts,
+                'metadata': metadata,
+                'statistics': {
+                    'word_count': word_count,
+                    'char_count': char_count,
+                    'estimated_reading_time': PDFProcessor.estimate_reading_time(word_count),
+                    'difficulty_score': difficulty_score
+                }
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'output_path': out_path,
+                'statistics': {
+                    'word_count': 0,
+                    'char_count': 0,
+                    'estimated_reading_time': 0,
+                    'difficulty_score': 0.5
+                }
+            }
+    
+    @staticmethod
+    def _extract_page_texts(pdf_reader: PyPDF2.PdfReader, file_bytes: bytes) -> List[Dict[str, Any]]:
+        """
+        Extract per-page text entries in page order
+        
+        Uses the configured native backend when available. Otherwise long
+        documents are split into contiguous page ranges extracted with pypdf
+        in parallel worker processes; short ones are extracted in-process.
+        
+        Args:
+            pdf_reader: Reader already opened on file_bytes
+            file_bytes: Raw PDF bytes, re-parsed by each worker
+            
+        Returns:
+            List of page entries (page_number, text, word_count[, error])
+        """
+        native_backend = _NATIVE_BACKENDS.get(settings.PDF_BACKEND)
+        if native_backend is not None:
+            try:
+                return [_page_entry(page_text, page_num) for page_num, page_text in enumerate(native_backend(file_bytes))]
+            except Exception as e:
+                # Backend not installed or unable to read this file; fall back to pypdf
+                logger.warning("PDF backend %s failed, using pypdf: %s", settings.PDF_BACKEND, e)
+        
+        total_pages = len(pdf_reader.pages)
+        num_workers = min(_MAX_EXTRACT_WORKERS, total_pages // _PARALLEL_MIN_PAGES)
+        
+        if num_workers > 1:
+            chunk_size = -(-total_pages // num_workers)
+            executor = None
+            try:
+                # Each finished range fills its own slots, so pages land in order without sorting
+                page_texts: List[Optional[Dict[str, Any]]] = [None] * total_pages
+                executor = _get_extract_pool()
+                futures = {
+                    executor.submit(_extract_page_range, file_bytes, start, min(start + chunk_size, total_pages)): start
+                    for start in range(0, total_pages, chunk_size)
+                }
+                for future in as_completed(futures):
+                    entries = future.result()
+                    start = futures[future]
+                    page_texts[start:start + len(entries)] = entries
+                return page_texts
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    _discard_extract_pool(executor)
+                # Pool unavailable (e.g. no forkserver/spawn support); fall back to sequential extraction
+                logger.warning("Parallel PDF extraction failed, extracting sequentially: %s", e)
+        
+        return [_extract_page_entry(page, page_num) for page_num, page in enumerate(pdf_reader.pages)]
+    
     @staticmethod
     def estimate_reading_time(word_count: int, reading_speed: float = 200.0) -> float:
         """
@@ -204,44 +495,53 @@ class PDFProcessor:
         if not text or len(text.strip()) == 0:
             return 0.5
         
+        cache_key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with PDFProcessor._difficulty_cache_lock:
+            difficulty = PDFProcessor._difficulty_cache.get(cache_key)
+            if difficulty is not None:
+                PDFProcessor._difficulty_cache.move_to_end(cache_key)
+                return difficulty
+        
+        difficulty = PDFProcessor._compute_difficulty(text)
+        with PDFProcessor._difficulty_cache_lock:
+            PDFProcessor._difficulty_cache[cache_key] = difficulty
+            if len(PDFProcessor._difficulty_cache) > PDFProcessor._difficulty_cache_size:
+                PDFProcessor._difficulty_cache.popitem(last=False)
+        return difficulty
+    
+    @staticmethod
+    def _compute_difficulty(text: str) -> float:
+        """Difficulty score for non-empty text without consulting the cache"""
         try:
             # Basic text analysis metrics
-            sentences = re.split(r'[.!?]+', text)
-            sentences = [s.strip() for s in sentences if s.strip()]
-            words = text.split()
+            # Only the number of non-blank sentences is needed
+            sentence_count = len(_SENTENCE_RE.findall(text))
+            # Word count, then word length, complex word (more than 6 characters) and
+            # syllable totals over the (possibly sampled) words
+            threshold = PDFProcessor.DIFFICULTY_SAMPLE_THRESHOLD
+            if text.isascii():
+                word_count, sampled, total_length, complex_count, total_syllables = _ascii_word_metrics(text, threshold)
+            else:
+                word_count, sampled, total_length, complex_count, total_syllables = PDFProcessor._word_metrics(text, threshold)
             
-            if len(sentences) == 0 or len(words) == 0:
+            if sentence_count == 0 or word_count == 0:
                 return 0.5
             
             # Average sentence length
-            avg_sentence_length = len(words) / len(sentences)
+            avg_sentence_length = word_count / sentence_count
             
             # Average word length
-            avg_word_length = sum(len(word) for word in words) / len(words)
+            avg_word_length = total_length / sampled
             
-            # Count of complex words (more than 6 characters)
-            complex_words = [word for word in words if len(word) > 6]
-            complex_word_ratio = len(complex_words) / len(words)
+            # Ratio of complex words
+            complex_word_ratio = complex_count / sampled
             
             # Flesch Reading Ease approximation
             # Higher values = easier text
-            flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * (sum(PDFProcessor._count_syllables(word) for word in words) / len(words)))
+            flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * (total_syllables / sampled))
             
             # Convert to difficulty score (0.0 = easy, 1.0 = very difficult)
-            if flesch_score >= 90:
-                difficulty = 0.1  # Very easy
-            elif flesch_score >= 80:
-                difficulty = 0.2  # Easy
-            elif flesch_score >= 70:
-                difficulty = 0.3  # Fairly easy
-            elif flesch_score >= 60:
-                difficulty = 0.4  # Standard
-            elif flesch_score >= 50:
-                difficulty = 0.5  # Fairly difficult
-            elif flesch_score >= 30:
-                difficulty = 0.7  # Difficult
-            else:
-                difficulty = 0.9  # Very difficult
+            difficulty = _FLESCH_DIFFICULTY_LEVELS[bisect_right(_FLESCH_THRESHOLDS, flesch_score)]
             
             # Adjust based on other factors
             if complex_word_ratio > 0.3:
@@ -253,10 +553,35 @@ class PDFProcessor:
             return min(max(difficulty, 0.0), 1.0)
             
         except Exception as e:
-            print(f"Error calculating difficulty: {e}")
+            logger.warning("Error calculating difficulty: %s", e)
             return 0.5
     
     @staticmethod
+    def _word_metrics(text: str, sample_threshold: int) -> Tuple[int, int, int, int, int]:
+        """
+        Word count, sampled word count, and total word length, complex word count
+        and syllable total over the sample, in one pass
+        
+        Texts above sample_threshold words are sampled with a fixed stride, so
+        results stay deterministic.
+        """
+        all_words = text.split()
+        words = all_words
+        if len(all_words) > sample_threshold:
+            words = all_words[::len(all_words) // sample_threshold]
+        count_syllables = PDFProcessor._count_syllables
+        total_length = 0
+        complex_count = 0
+        total_syllables = 0
+        for word in words:
+            word_length = len(word)
+            total_length += word_length
+            complex_count += word_length > 6
+            total_syllables += count_syllables(word)
+        return len(all_words), len(words), total_length, complex_count, total_syllables
+    
+    @staticmethod
+    @lru_cache(maxsize=65536)
     def _count_syllables(word: str) -> int:
         """
         Estimate syllable count in a word
@@ -268,15 +593,7 @@ class PDFProcessor:
             Estimated number of syllables
         """
         word = word.lower()
-        vowels = "aeiouy"
-        syllable_count = 0
-        previous_was_vowel = False
-        
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not previous_was_vowel:
-                syllable_count += 1
-            previous_was_vowel = is_vowel
+        syllable_count = len(_VOWEL_GROUP_RE.findall(word))
         
         # Handle silent 'e'
         if word.endswith('e'):
@@ -300,49 +617,58 @@ class PDFProcessor:
         if not text or len(text.strip()) == 0:
             return []
         
+        cache_key = (hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest(), max_section_words)
+        with PDFProcessor._sections_cache_lock:
+            cached = PDFProcessor._sections_cache.get(cache_key)
+            if cached is not None:
+                PDFProcessor._sections_cache.move_to_end(cache_key)
+        if cached is None:
+            cached = PDFProcessor._split_sections(text, max_section_words)
+            with PDFProcessor._sections_cache_lock:
+                PDFProcessor._sections_cache[cache_key] = cached
+                if len(PDFProcessor._sections_cache) > PDFProcessor._sections_cache_size:
+                    PDFProcessor._sections_cache.popitem(last=False)
+        
+        # Section values are immutable, so copying each dict is enough to protect the cache
+        return [dict(section) for section in cached]
+    
+    @staticmethod
+    def _split_sections(text: str, max_section_words: int) -> List[Dict[str, Any]]:
+        """Split non-empty text into sections without consulting the cache"""
         try:
-            # Split by paragraphs first
-            paragraphs = text.split('\n\n')
-            sections = []
-            current_section = ""
-            current_word_count = 0
-            section_number = 1
-            
-            for paragraph in paragraphs:
+            # Split by paragraphs first and count each paragraph's words once
+            paragraphs = []
+            for paragraph in text.split('\n\n'):
                 paragraph = paragraph.strip()
-                if not paragraph:
-                    continue
-                
-                para_words = len(paragraph.split())
-                
-                # If adding this paragraph would exceed the limit, start new section
-                if current_word_count + para_words > max_section_words and current_section:
-                    sections.append({
-                        'section_number': section_number,
-                        'text': current_section.strip(),
-                        'word_count': current_word_count,
-                        'estimated_reading_time': PDFProcessor.estimate_reading_time(current_word_count)
-                    })
-                    current_section = paragraph
-                    current_word_count = para_words
-                    section_number += 1
-                else:
-                    current_section += "\n\n" + paragraph if current_section else paragraph
-                    current_word_count += para_words
+                if paragraph:
+                    paragraphs.append(paragraph)
+            if not paragraphs:
+                return []
             
-            # Add the last section if it has content
-            if current_section.strip():
+            # word_prefix[i] is the word count of the first i paragraphs
+            word_prefix = np.zeros(len(paragraphs) + 1, dtype=np.int64)
+            np.cumsum([len(paragraph.split()) for paragraph in paragraphs], out=word_prefix[1:])
+            
+            # Each section greedily takes paragraphs while it stays within the limit,
+            # always at least one; its end is found by binary search on the prefix sums
+            sections = []
+            start = 0
+            while start < len(paragraphs):
+                end = int(np.searchsorted(word_prefix, word_prefix[start] + max_section_words, side='right')) - 1
+                end = max(end, start + 1)
+                section_word_count = int(word_prefix[end] - word_prefix[start])
                 sections.append({
-                    'section_number': section_number,
-                    'text': current_section.strip(),
-                    'word_count': current_word_count,
-                    'estimated_reading_time': PDFProcessor.estimate_reading_time(current_word_count)
+                    'section_number': len(sections) + 1,
+                    'text': "\n\n".join(paragraphs[start:end]),
+                    'word_count': section_word_count,
+                    'estimated_reading_time': PDFProcessor.estimate_reading_time(section_word_count)
                 })
+                start = end
             
             return sections
             
         except Exception as e:
-            print(f"Error extracting sections: {e}")
+            logger.warning("Error extracting sections: %s", e)
             return [{
                 'section_number': 1,
                 'text': text,
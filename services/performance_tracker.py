@@ -1,14 +1,237 @@
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.engine import Row
+from sqlalchemy import func, select, insert, update, case, table, column, bindparam, event, true, inspect
+from sqlalchemy.exc import DBAPIError
 from models import User, Performance, StudySession, Quiz, Material
 
+logger = logging.getLogger(__name__)
+
+
+# Learning status by average recent score: (minimum score, status), highest first
+_LEARNING_STATUS_THRESHOLDS = ((0.8, 'mastery'), (0.6, 'progressing'))
+_DEFAULT_LEARNING_STATUS = 'struggling'
+_STATUS_RECOMMENDATIONS = {
+    'mastery': 'Ready for advanced material or spaced review',
+    'progressing': 'Continue with current pace',
+    'struggling': 'Consider reviewing fundamentals or reducing difficulty'
+}
+
+
+def _build_quiz_aggregate_statement(by_material: bool):
+    """
+    Aggregate a user's quiz performances since :cutoff into one row
+    
+    Halves split the performances in recording (ID) order; the later half
+    holds the extra performance when the count is odd.
+    """
+    ranked = select(
+        Performance.score,
+        Performance.time_taken,
+        func.row_number().over(order_by=Performance.id).label('position'),
+        func.count().over().label('total')
+    ).where(
+        Performance.user_id == bindparam('user_id'),
+        Performance.created_at >= bindparam('cutoff')
+    )
+    if by_material:
+        ranked = ranked.join(Quiz).where(Quiz.material_id == bindparam('material_id'))
+    ranked = ranked.subquery()
+    
+    later_half = ranked.c.position * 2 > ranked.c.total
+    return select(
+        func.count().label('total_quizzes'),
+        func.avg(ranked.c.score).label('average_score'),
+        func.min(ranked.c.score).label('min_score'),
+        func.max(ranked.c.score).label('max_score'),
+        func.avg(case((ranked.c.time_taken != 0, ranked.c.time_taken))).label('average_time'),
+        func.avg(case((~later_half, ranked.c.score))).label('early_average'),
+        func.avg(case((later_half, ranked.c.score))).label('recent_average')
+    )
+
+
+def _build_session_aggregate_statement():
+    """
+    Aggregate a user's study sessions since :cutoff into one row
+    
+    Focus halves split all sessions in ID order; speed halves split only the
+    sessions with a positive reading speed.
+    """
+    speed_flag = case((StudySession.reading_speed > 0, 1), else_=0)
+    ranked = select(
+        StudySession.duration_minutes,
+        StudySession.focus_score,
+        StudySession.reading_speed,
+        StudySession.completion_percentage,
+        func.row_number().over(order_by=StudySession.id).label('position'),
+        func.count().over().label('total'),
+        func.sum(speed_flag).over(order_by=StudySession.id).label('speed_position'),
+        func.sum(speed_flag).over().label('speed_total')
+    ).where(
+        StudySession.user_id == bindparam('user_id'),
+        StudySession.start_time >= bindparam('cutoff')
+    ).subquery()
+    
+    later_half = ranked.c.position * 2 > ranked.c.total
+    speed_later_half = ranked.c.speed_position * 2 > ranked.c.speed_total
+    has_speed = ranked.c.reading_speed > 0
+    return select(
+        func.count().label('total_sessions'),
+        func.sum(ranked.c.duration_minutes).label('total_study_time'),
+        func.avg(case((ranked.c.duration_minutes != 0, ranked.c.duration_minutes))).label('average_session_duration'),
+        func.avg(ranked.c.focus_score).label('average_focus_score'),
+        func.avg(case((ranked.c.reading_speed != 0, ranked.c.reading_speed))).label('average_reading_speed'),
+        func.avg(ranked.c.completion_percentage).label('average_completion'),
+        func.avg(case((~later_half, ranked.c.focus_score))).label('early_focus'),
+        func.avg(case((later_half, ranked.c.focus_score))).label('recent_focus'),
+        func.coalesce(func.max(ranked.c.speed_total), 0).label('speed_sessions'),
+        func.avg(case((has_speed & ~speed_later_half, ranked.c.reading_speed))).label('early_speed'),
+        func.avg(case((has_speed & speed_later_half, ranked.c.reading_speed))).label('recent_speed')
+    )
+
+
+def _build_cohort_recent_statement():
+    """Average each listed user's last five performances on :material_id, one row per user"""
+    ranked = select(
+        Performance.user_id,
+        Performance.score,
+        Performance.comprehension_speed,
+        func.row_number().over(
+            partition_by=Performance.user_id,
+            order_by=Performance.created_at.desc()
+        ).label('position')
+    ).join(Quiz).where(
+        Performance.user_id.in_(bindparam('user_ids', expanding=True)),
+        Quiz.material_id == bindparam('material_id')
+    ).subquery()
+    
+    return select(
+        ranked.c.user_id,
+        func.avg(ranked.c.score).label('average_score'),
+        (func.coalesce(func.sum(case(
+            (ranked.c.comprehension_speed != 0, ranked.c.comprehension_speed)
+        )), 0.0) / func.count()).label('average_speed'),
+        func.count().label('total_attempts')
+    ).where(ranked.c.position <= 5).group_by(ranked.c.user_id)
+
+
+def _build_analytics_aggregate_statement(by_material: bool):
+    """
+    Join the one-row quiz and session aggregates into a single row, so both
+    come back in one round trip with the column names of the
+    user_recent_analytics view
+    """
+    quiz_aggregates = _build_quiz_aggregate_statement(by_material).subquery('quiz_aggregates')
+    session_aggregates = _build_session_aggregate_statement().subquery('session_aggregates')
+    return select(quiz_aggregates, session_aggregates).select_from(
+        quiz_aggregates.join(session_aggregates, true())
+    )
+
+
+# Statements are built once at import and executed with bound parameters, so each
+# call skips query construction and reuses the compiled-statement cache entry
+_ANALYTICS_AGGREGATE_STMT = _build_analytics_aggregate_statement(by_material=False)
+_MATERIAL_ANALYTICS_AGGREGATE_STMT = _build_analytics_aggregate_statement(by_material=True)
+_COHORT_RECENT_STMT = _build_cohort_recent_statement()
+
+_RECENT_ANALYTICS_VIEW = table(
+    'user_recent_analytics',
+    column('user_id'),
+    column('total_quizzes'), column('average_score'), column('min_score'),
+    column('max_score'), column('average_time'), column('early_average'),
+    column('recent_average'),
+    column('total_sessions'), column('total_study_time'),
+    column('average_session_duration'), column('average_focus_score'),
+    column('average_reading_speed'), column('average_completion'),
+    column('early_focus'), column('recent_focus'), column('speed_sessions'),
+    column('early_speed'), column('recent_speed')
+)
+_RECENT_ANALYTICS_STMT = select(_RECENT_ANALYTICS_VIEW).where(
+    _RECENT_ANALYTICS_VIEW.c.user_id == bindparam('user_id')
+)
+
+_USER_PROFILE_STMT = select(
+    User.average_reading_speed,
+    User.retention_rate,
+    User.cognitive_load_limit
+).where(User.id == bindparam('user_id'))
+
+_QUIZ_STMT = select(Quiz).where(Quiz.id == bindparam('quiz_id'))
+
+_QUIZ_DIFFICULTIES_STMT = select(Quiz.id, Quiz.difficulty_level).where(
+    Quiz.id.in_(bindparam('quiz_ids', expanding=True))
+)
+
+# Retention rate is an exponential moving average of quiz scores:
+# new = old * RETENTION_DECAY + score * (1 - RETENTION_DECAY)
+RETENTION_DECAY = 0.7
+
+# Folds :decay/:carried (see _update_user_metrics) into the stored average in one statement;
+# identity-mapped users are not synchronized, readers select the columns directly
+_RETENTION_EMA_STMT = update(User).where(User.id == bindparam('user_id')).values(
+    retention_rate=User.retention_rate * bindparam('decay') + bindparam('carried')
+).execution_options(synchronize_session=False)
+
+_RECENT_READING_SPEEDS_STMT = select(StudySession.reading_speed).where(
+    StudySession.user_id == bindparam('user_id'),
+    StudySession.reading_speed.isnot(None),
+    StudySession.start_time >= bindparam('cutoff')
+).order_by(StudySession.start_time.desc()).limit(10)
+
+# Streamed in batches of 500 rows so long histories are never buffered as a whole
+_LEARNING_CURVE_STMT = select(
+    Performance.score,
+    Performance.time_taken,
+    Performance.comprehension_speed,
+    Performance.created_at,
+    Performance.difficulty_handled
+).join(Quiz).where(
+    Performance.user_id == bindparam('user_id'),
+    Quiz.material_id == bindparam('material_id')
+).order_by(Performance.created_at).execution_options(yield_per=500)
+
+_RECENT_MATERIAL_PERFORMANCES_STMT = select(
+    Performance.score,
+    Performance.comprehension_speed
+).join(Quiz).where(
+    Performance.user_id == bindparam('user_id'),
+    Quiz.material_id == bindparam('material_id')
+).order_by(Performance.created_at.desc()).limit(5)
+
+
 class PerformanceTracker:
     """Service for tracking and analyzing user performance"""
     
-    def __init__(self, db: Session):
+    # Window covered by the user_recent_analytics materialized view
+    RECENT_ANALYTICS_DAYS = 30
+    
+    # Whether user_recent_analytics exists, checked once per process on first use
+    _recent_analytics_view_available: Optional[bool] = None
+    
+    # User profile metrics keyed by user ID with their load time, shared across instances;
+    # the metric updates in this class invalidate their user's entry
+    _profile_cache: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _profile_cache_lock = threading.Lock()
+    _profile_cache_size = 4096
+    _profile_cache_ttl = 300.0  # seconds; bounds staleness from writes in other processes
+    
+    # Deferred metric updates run one at a time off the request path; a (method, user)
+    # pair already waiting in the queue absorbs further submissions for that user
+    _metrics_executor: Optional[ThreadPoolExecutor] = None
+    _metrics_lock = threading.Lock()
+    _pending_metrics_updates: set = set()
+    
+    def __init__(self, db: Session, db_session_factory: Optional[Callable[[], Session]] = None):
         self.db = db
+        # When set, user metric updates run in the background after the caller commits
+        self.db_session_factory = db_session_factory
     
     def record_quiz_performance(
         self,
@@ -34,10 +257,12 @@ class PerformanceTracker:
             
         Returns:
             Dictionary with recorded performance data
+        
+        Rows are written but not committed; the caller commits the request.
         """
         try:
             # Get quiz and material info for context
-            quiz = self.db.query(Quiz).filter(Quiz.id == quiz_id).first()
+            quiz = self.db.scalars(_QUIZ_STMT, {'quiz_id': quiz_id}).first()
             if not quiz:
                 return {'success': False, 'error': 'Quiz not found'}
             
@@ -45,31 +270,30 @@ class PerformanceTracker:
             comprehension_speed = questions_total / time_taken if time_taken > 0 else 0
             difficulty_handled = quiz.difficulty_level
             
-            # Create performance record
-            performance = Performance(
-                user_id=user_id,
-                quiz_id=quiz_id,
-                score=score,
-                time_taken=time_taken,
-                questions_correct=questions_correct,
-                questions_total=questions_total,
-                comprehension_speed=comprehension_speed,
-                difficulty_handled=difficulty_handled,
-                question_responses=question_responses or {}
-            )
-            
-            self.db.add(performance)
-            self.db.commit()
+            # Create performance record; RETURNING yields the ID in the same round trip
+            performance_id = self.db.execute(
+                insert(Performance).values(
+                    user_id=user_id,
+                    quiz_id=quiz_id,
+                    score=score,
+                    time_taken=time_taken,
+                    questions_correct=questions_correct,
+                    questions_total=questions_total,
+                    comprehension_speed=comprehension_speed,
+                    difficulty_handled=difficulty_handled,
+                    question_responses=question_responses or {}
+                ).returning(Performance.id)
+            ).scalar_one()
             
             # Update user's learning metrics
-            self._update_user_metrics(user_id)
+            self._update_user_metrics(user_id, [score])
             
             # Analyze performance patterns
             analysis = self._analyze_recent_performance(user_id, quiz.material_id)
             
             return {
                 'success': True,
-                'performance_id': performance.id,
+                'performance_id': performance_id,
                 'analysis': analysis
             }
             
@@ -77,6 +301,72 @@ class PerformanceTracker:
             self.db.rollback()
             return {'success': False, 'error': str(e)}
     
+    def record_quiz_performances_bulk(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Record many quiz performances at once (e.g. a class submitting together)
+        
+        Quizzes are looked up in one query, the performances are inserted with a
+        single executemany, and user metrics are recomputed once per user.
+        
+        Args:
+            entries: Dictionaries with the arguments of record_quiz_performance
+                (user_id, quiz_id, score, time_taken, questions_correct,
+                questions_total and optionally question_responses)
+            
+        Returns:
+            Dictionary with the new performance IDs in entry order
+        
+        Rows are written but not committed; the caller commits the request.
+        """
+        if not entries:
+            return {'success': True, 'performance_ids': [], 'recorded': 0}
+        
+        try:
+            quiz_ids = {entry['quiz_id'] for entry in entries}
+            difficulty_by_quiz = dict(
+                self.db.execute(_QUIZ_DIFFICULTIES_STMT, {'quiz_ids': list(quiz_ids)}).all()
+            )
+            missing = sorted(quiz_ids - difficulty_by_quiz.keys())
+            if missing:
+                return {'success': False, 'error': f'Quiz not found: {missing}'}
+            
+            rows = []
+            for entry in entries:
+                time_taken = entry['time_taken']
+                rows.append({
+                    'user_id': entry['user_id'],
+                    'quiz_id': entry['quiz_id'],
+                    'score': entry['score'],
+                    'time_taken': time_taken,
+                    'questions_correct': entry['questions_correct'],
+                    'questions_total': entry['questions_total'],
+                    'comprehension_speed': entry['questions_total'] / time_taken if time_taken > 0 else 0,
+                    'difficulty_handled': difficulty_by_quiz[entry['quiz_id']],
+                    'question_responses': entry.get('question_responses') or {}
+                })
+            
+            performance_ids = self.db.scalars(
+                insert(Performance).returning(Performance.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            
+            # Update each user's learning metrics once for the whole batch
+            scores_by_user: Dict[int, List[float]] = {}
+            for entry in entries:
+                scores_by_user.setdefault(entry['user_id'], []).append(entry['score'])
+            for user_id, scores in scores_by_user.items():
+                self._update_user_metrics(user_id, scores)
+            
+            return {
+                'success': True,
+                'performance_ids': list(performance_ids),
+                'recorded': len(performance_ids)
+            }
+            
+        except Exception as e:
+            self.db.rollback()
+            return {'success': False, 'error': str(e)}
+    
     def record_study_session(
         self,
         user_id: int,
@@ -91,6 +381,8 @@ class PerformanceTracker:
             
         Returns:
             Dictionary with recorded session data
+        
+        Rows are written but not committed; the caller commits the request.
         """
         try:
             # Calculate derived metrics
@@ -103,8 +395,8 @@ class PerformanceTracker:
                 if 'words_read' in session_data and duration > 0:
                     reading_speed = session_data['words_read'] / duration
             
-            # Create study session record
-            session = StudySession(
+            # Create study session record; RETURNING yields the ID in the same round trip
+            session_id = self.db.execute(insert(StudySession).values(
                 user_id=user_id,
                 schedule_id=session_data.get('schedule_id'),
                 start_time=session_data['start_time'],
@@ -120,17 +412,14 @@ class PerformanceTracker:
                 completion_percentage=session_data.get('completion_percentage', 0.0),
                 self_rated_understanding=session_data.get('self_rated_understanding'),
                 session_notes=session_data.get('session_notes')
-            )
-            
-            self.db.add(session)
-            self.db.commit()
+            ).returning(StudySession.id)).scalar_one()
             
             # Update user's reading metrics
-            self._update_reading_metrics(user_id)
+            self._refresh_metrics('_update_reading_metrics', user_id)
             
             return {
                 'success': True,
-                'session_id': session.id,
+                'session_id': session_id,
                 'calculated_duration': duration,
                 'calculated_reading_speed': reading_speed
             }
@@ -159,36 +448,23 @@ class PerformanceTracker:
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days_back)
             
-            # Get quiz performances
-            quiz_query = self.db.query(Performance).filter(
-                Performance.user_id == user_id,
-                Performance.created_at >= cutoff_date
-            )
-            
-            if material_id:
-                quiz_query = quiz_query.join(Quiz).filter(Quiz.material_id == material_id)
-            
-            quiz_performances = quiz_query.all()
-            
-            # Get study sessions
-            session_query = self.db.query(StudySession).filter(
-                StudySession.user_id == user_id,
-                StudySession.start_time >= cutoff_date
-            )
-            
-            study_sessions = session_query.all()
+            # The default window is precomputed; otherwise aggregate both tables in one query.
+            # Either way a single row carries the quiz and the session aggregates
+            stats = None
+            if material_id is None and days_back == self.RECENT_ANALYTICS_DAYS:
+                stats = self._query_precomputed_recent_analytics(user_id)
+            if stats is None:
+                stats = self._fetch_analytics_aggregates(user_id, material_id, cutoff_date)
+            quiz_stats = session_stats = stats
             
             # Calculate quiz metrics
-            quiz_metrics = self._calculate_quiz_metrics(quiz_performances)
+            quiz_metrics = self._calculate_quiz_metrics(quiz_stats)
             
             # Calculate study session metrics
-            session_metrics = self._calculate_session_metrics(study_sessions)
+            session_metrics = self._calculate_session_metrics(session_stats)
             
             # Calculate learning trends
-            trends = self._calculate_learning_trends(quiz_performances, study_sessions)
-            
-            # Get user's current metrics
-            user = self.db.query(User).filter(User.id == user_id).first()
+            trends = self._calculate_learning_trends(quiz_stats, session_stats)
             
             return {
                 'success': True,
@@ -196,11 +472,7 @@ class PerformanceTracker:
                 'quiz_metrics': quiz_metrics,
                 'session_metrics': session_metrics,
                 'learning_trends': trends,
-                'user_profile': {
-                    'average_reading_speed': user.average_reading_speed if user else 200,
-                    'retention_rate': user.retention_rate if user else 0.7,
-                    'cognitive_load_limit': user.cognitive_load_limit if user else 1.0
-                }
+                'user_profile': self._get_user_profile(user_id)
             }
             
         except Exception as e:
@@ -218,38 +490,37 @@ class PerformanceTracker:
             Dictionary with learning curve data points
         """
         try:
-            # Get all performances for this material
-            performances = self.db.query(Performance).join(Quiz).filter(
-                Performance.user_id == user_id,
-                Quiz.material_id == material_id
-            ).order_by(Performance.created_at).all()
+            # Get all performances for this material as plain column tuples
+            performances = self.db.execute(_LEARNING_CURVE_STMT, {
+                'user_id': user_id, 'material_id': material_id
+            })
             
-            if not performances:
+            # Create data points for learning curve
+            data_points = [
+                {
+                    'session_number': i,
+                    'score': score,
+                    'time_taken': time_taken,
+                    'comprehension_speed': comprehension_speed,
+                    'date': created_at.isoformat(),
+                    'difficulty': difficulty_handled
+                }
+                for i, (score, time_taken, comprehension_speed, created_at, difficulty_handled)
+                in enumerate(performances, start=1)
+            ]
+            
+            if not data_points:
                 return {
                     'success': True,
                     'data_points': [],
                     'trend': 'no_data'
                 }
             
-            # Create data points for learning curve
-            data_points = []
-            for i, perf in enumerate(performances):
-                data_points.append({
-                    'session_number': i + 1,
-                    'score': perf.score,
-                    'time_taken': perf.time_taken,
-                    'comprehension_speed': perf.comprehension_speed,
-                    'date': perf.created_at.isoformat(),
-                    'difficulty': perf.difficulty_handled
-                })
-            
             # Calculate trend
-            if len(performances) >= 3:
-                recent_scores = [p.score for p in performances[-3:]]
-                early_scores = [p.score for p in performances[:3]]
-                
-                recent_avg = sum(recent_scores) / len(recent_scores)
-                early_avg = sum(early_scores) / len(early_scores)
+            if len(data_points) >= 3:
+                scores = np.fromiter((point['score'] for point in data_points), dtype=np.float64, count=len(data_points))
+                recent_avg = scores[-3:].mean()
+                early_avg = scores[:3].mean()
                 
                 if recent_avg > early_avg + 0.1:
                     trend = 'improving'
@@ -264,74 +535,191 @@ class PerformanceTracker:
                 'success': True,
                 'data_points': data_points,
                 'trend': trend,
-                'total_sessions': len(performances)
+                'total_sessions': len(data_points)
             }
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def _update_user_metrics(self, user_id: int):
-        """Update user's learning metrics based on recent performance"""
-        try:
-            user = self.db.query(User).filter(User.id == user_id).first()
-            if not user:
+    def _get_user_profile(self, user_id: int) -> Dict[str, Any]:
+        """Get the user's current learning metrics, cached for _profile_cache_ttl seconds"""
+        now = time.monotonic()
+        with PerformanceTracker._profile_cache_lock:
+            cached = PerformanceTracker._profile_cache.get(user_id)
+            if cached is not None and now - cached[0] < PerformanceTracker._profile_cache_ttl:
+                PerformanceTracker._profile_cache.move_to_end(user_id)
+                return dict(cached[1])
+        
+        row = self.db.execute(_USER_PROFILE_STMT, {'user_id': user_id}).first()
+        profile = {
+            'average_reading_speed': row.average_reading_speed if row else 200,
+            'retention_rate': row.retention_rate if row else 0.7,
+            'cognitive_load_limit': row.cognitive_load_limit if row else 1.0
+        }
+        
+        with PerformanceTracker._profile_cache_lock:
+            PerformanceTracker._profile_cache[user_id] = (now, dict(profile))
+            PerformanceTracker._profile_cache.move_to_end(user_id)
+            if len(PerformanceTracker._profile_cache) > PerformanceTracker._profile_cache_size:
+                PerformanceTracker._profile_cache.popitem(last=False)
+        return profile
+    
+    @classmethod
+    def _invalidate_user_profile(cls, user_id: int):
+        """Drop the user's cached profile after its metrics change"""
+        with cls._profile_cache_lock:
+            cls._profile_cache.pop(user_id, None)
+    
+    def _invalidate_user_profile_on_commit(self, user_id: int):
+        """
+        Drop the user's cached profile now and again once this session commits; a reader
+        in between would otherwise re-cache the pre-commit metrics for the full TTL
+        """
+        self._invalidate_user_profile(user_id)
+        event.listen(
+            self.db, 'after_commit',
+            lambda session: self._invalidate_user_profile(user_id),
+            once=True
+        )
+    
+    def _refresh_metrics(self, method_name: str, user_id: int):
+        """
+        Run a user metric update now, or without a session factory defer it until
+        the caller's transaction commits so the update sees the new rows
+        """
+        if self.db_session_factory is None:
+            getattr(self, method_name)(user_id=user_id)
+            return
+        
+        event.listen(
+            self.db, 'after_commit',
+            lambda session: self._enqueue_metrics_update(method_name, user_id),
+            once=True
+        )
+    
+    def _enqueue_metrics_update(self, method_name: str, user_id: int):
+        """Queue a metric update unless one for the same user is still waiting"""
+        key = (method_name, user_id)
+        with PerformanceTracker._metrics_lock:
+            if key in PerformanceTracker._pending_metrics_updates:
                 return
-            
-            # Get recent performances
-            recent_performances = self.db.query(Performance).filter(
-                Performance.user_id == user_id,
-                Performance.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).limit(20).all()
-            
-            if recent_performances:
-                # Update retention rate
-                avg_score = sum(p.score for p in recent_performances) / len(recent_performances)
-                user.retention_rate = (user.retention_rate * 0.7) + (avg_score * 0.3)
-                
-                # Update cognitive load limit based on performance under different loads
-                high_load_performances = [p for p in recent_performances if hasattr(p, 'cognitive_load') and p.cognitive_load > 0.7]
-                if high_load_performances:
-                    high_load_avg = sum(p.score for p in high_load_performances) / len(high_load_performances)
-                    if high_load_avg > 0.7:
-                        user.cognitive_load_limit = min(1.5, user.cognitive_load_limit * 1.1)
-                    elif high_load_avg < 0.5:
-                        user.cognitive_load_limit = max(0.5, user.cognitive_load_limit * 0.9)
-                
-                self.db.commit()
-                
+            PerformanceTracker._pending_metrics_updates.add(key)
+            if PerformanceTracker._metrics_executor is None:
+                PerformanceTracker._metrics_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='performance-metrics'
+                )
+            executor = PerformanceTracker._metrics_executor
+        executor.submit(self._run_metrics_update, self.db_session_factory, method_name, user_id)
+    
+    @staticmethod
+    def _run_metrics_update(
+        session_factory: Callable[[], Session],
+        method_name: str,
+        user_id: int
+    ):
+        """Apply a queued metric update in its own session"""
+        # Submissions arriving from here on queue a fresh update that will see them
+        with PerformanceTracker._metrics_lock:
+            PerformanceTracker._pending_metrics_updates.discard((method_name, user_id))
+        
+        db = session_factory()
+        try:
+            getattr(PerformanceTracker(db), method_name)(user_id=user_id)
+            db.commit()
         except Exception as e:
-            print(f"Error updating user metrics: {e}")
-            self.db.rollback()
+            logger.warning("Error applying queued %s for user %d: %s", method_name, user_id, e)
+            db.rollback()
+        finally:
+            db.close()
+            PerformanceTracker._invalidate_user_profile(user_id)
+    
+    def _update_user_metrics(self, user_id: int, scores: List[float]):
+        """
+        Fold new quiz scores, oldest first, into the user's retention rate
+        
+        Applying the moving-average step once per score collapses to
+        old * decay**n + sum(score_i * (1 - decay) * decay**(n - 1 - i)),
+        so any number of scores costs a single UPDATE and no reads.
+        """
+        if not scores:
+            return
+        
+        carried = 0.0
+        for score in scores:
+            carried = carried * RETENTION_DECAY + score * (1 - RETENTION_DECAY)
+        
+        self.db.execute(_RETENTION_EMA_STMT, {
+            'user_id': user_id,
+            'decay': RETENTION_DECAY ** len(scores),
+            'carried': carried
+        })
+        self._invalidate_user_profile_on_commit(user_id)
     
     def _update_reading_metrics(self, user_id: int):
         """Update user's reading speed based on recent sessions"""
         try:
-            user = self.db.query(User).filter(User.id == user_id).first()
-            if not user:
-                return
-            
-            # Get recent study sessions with reading speed data
-            recent_sessions = self.db.query(StudySession).filter(
-                StudySession.user_id == user_id,
-                StudySession.reading_speed.isnot(None),
-                StudySession.start_time >= datetime.utcnow() - timedelta(days=30)
-            ).limit(10).all()
-            
-            if recent_sessions:
-                speeds = [s.reading_speed for s in recent_sessions if s.reading_speed > 0]
-                if speeds:
-                    avg_speed = sum(speeds) / len(speeds)
-                    # Weighted average with existing speed
-                    user.average_reading_speed = (user.average_reading_speed * 0.7) + (avg_speed * 0.3)
-                    self.db.commit()
+            # Savepoint so a failed update does not discard the caller's pending writes
+            with self.db.begin_nested():
+                user = self.db.get(User, user_id)
+                if not user:
+                    return
+                
+                # Get recent reading speeds
+                recent_speeds = self.db.scalars(_RECENT_READING_SPEEDS_STMT, {
+                    'user_id': user_id,
+                    'cutoff': datetime.utcnow() - timedelta(days=30)
+                }).all()
+                
+                if recent_speeds:
+                    speeds = [speed for speed in recent_speeds if speed > 0]
+                    if speeds:
+                        avg_speed = sum(speeds) / len(speeds)
+                        # Weighted average with existing speed
+                        user.average_reading_speed = (user.average_reading_speed * 0.7) + (avg_speed * 0.3)
                     
         except Exception as e:
-            print(f"Error updating reading metrics: {e}")
-            self.db.rollback()
+            logger.warning("Error updating reading metrics: %s", e)
+        finally:
+            self._invalidate_user_profile_on_commit(user_id)
+    
+    def _query_precomputed_recent_analytics(self, user_id: int) -> Optional[Row]:
+        """
+        Read the user's rolling 30-day aggregates from the user_recent_analytics
+        materialized view. The row carries the columns of both the quiz and the
+        session aggregates. Returns None for users added since the last refresh
+        or when the view is not available (e.g. SQLite development databases).
+        """
+        if PerformanceTracker._recent_analytics_view_available is None:
+            PerformanceTracker._recent_analytics_view_available = inspect(self.db.get_bind()).has_table(
+                'user_recent_analytics'
+            )
+        if not PerformanceTracker._recent_analytics_view_available:
+            return None
+        
+        try:
+            return self.db.execute(_RECENT_ANALYTICS_STMT, {'user_id': user_id}).first()
+        except DBAPIError as e:
+            # Only a missing view (undefined_table) is permanent; transient errors propagate as-is
+            if getattr(e.orig, 'pgcode', None) == '42P01':
+                PerformanceTracker._recent_analytics_view_available = False
+            raise
     
-    def _calculate_quiz_metrics(self, performances: List[Performance]) -> Dict[str, Any]:
-        """Calculate quiz performance metrics"""
-        if not performances:
+    def _fetch_analytics_aggregates(
+        self,
+        user_id: int,
+        material_id: Optional[int],
+        cutoff_date: datetime
+    ) -> Row:
+        """Aggregate a user's quiz performances and study sessions since cutoff_date in one query"""
+        if material_id:
+            return self.db.execute(_MATERIAL_ANALYTICS_AGGREGATE_STMT, {
+                'user_id': user_id, 'cutoff': cutoff_date, 'material_id': material_id
+            }).one()
+        return self.db.execute(_ANALYTICS_AGGREGATE_STMT, {'user_id': user_id, 'cutoff': cutoff_date}).one()
+    
+    def _calculate_quiz_metrics(self, stats: Row) -> Dict[str, Any]:
+        """Calculate quiz performance metrics from aggregated performances"""
+        if not stats.total_quizzes:
             return {
                 'total_quizzes': 0,
                 'average_score': 0,
@@ -339,28 +727,23 @@ class PerformanceTracker:
                 'improvement_rate': 0
             }
         
-        scores = [p.score for p in performances]
-        times = [p.time_taken for p in performances if p.time_taken]
-        
         # Calculate improvement rate
         improvement_rate = 0
-        if len(scores) >= 2:
-            first_half = scores[:len(scores)//2]
-            second_half = scores[len(scores)//2:]
-            improvement_rate = (sum(second_half)/len(second_half)) - (sum(first_half)/len(first_half))
+        if stats.total_quizzes >= 2:
+            improvement_rate = stats.recent_average - stats.early_average
         
         return {
-            'total_quizzes': len(performances),
-            'average_score': sum(scores) / len(scores),
-            'average_time': sum(times) / len(times) if times else 0,
+            'total_quizzes': stats.total_quizzes,
+            'average_score': stats.average_score,
+            'average_time': stats.average_time if stats.average_time is not None else 0,
             'improvement_rate': improvement_rate,
-            'score_range': {'min': min(scores), 'max': max(scores)},
-            'consistency': 1 - (max(scores) - min(scores))  # Higher is more consistent
+            'score_range': {'min': stats.min_score, 'max': stats.max_score},
+            'consistency': 1 - (stats.max_score - stats.min_score)  # Higher is more consistent
         }
     
-    def _calculate_session_metrics(self, sessions: List[StudySession]) -> Dict[str, Any]:
-        """Calculate study session metrics"""
-        if not sessions:
+    def _calculate_session_metrics(self, stats: Row) -> Dict[str, Any]:
+        """Calculate study session metrics from aggregated sessions"""
+        if not stats.total_sessions:
             return {
                 'total_sessions': 0,
                 'total_study_time': 0,
@@ -368,25 +751,21 @@ class PerformanceTracker:
                 'average_focus_score': 0
             }
         
-        durations = [s.duration_minutes for s in sessions if s.duration_minutes]
-        focus_scores = [s.focus_score for s in sessions]
-        reading_speeds = [s.reading_speed for s in sessions if s.reading_speed]
-        
         return {
-            'total_sessions': len(sessions),
-            'total_study_time': sum(durations),
-            'average_session_duration': sum(durations) / len(durations) if durations else 0,
-            'average_focus_score': sum(focus_scores) / len(focus_scores),
-            'average_reading_speed': sum(reading_speeds) / len(reading_speeds) if reading_speeds else 0,
-            'completion_rate': sum(s.completion_percentage for s in sessions) / len(sessions) / 100
+            'total_sessions': stats.total_sessions,
+            'total_study_time': stats.total_study_time or 0,
+            'average_session_duration': stats.average_session_duration or 0,
+            'average_focus_score': stats.average_focus_score,
+            'average_reading_speed': stats.average_reading_speed or 0,
+            'completion_rate': stats.average_completion / 100
         }
     
     def _calculate_learning_trends(
         self,
-        performances: List[Performance],
-        sessions: List[StudySession]
+        quiz_stats: Row,
+        session_stats: Row
     ) -> Dict[str, Any]:
-        """Calculate learning trends over time"""
+        """Calculate learning trends over time from aggregated half averages"""
         trends = {
             'score_trend': 'stable',
             'speed_trend': 'stable',
@@ -394,12 +773,9 @@ class PerformanceTracker:
         }
         
         # Score trend
-        if len(performances) >= 4:
-            recent_scores = [p.score for p in performances[-len(performances)//2:]]
-            early_scores = [p.score for p in performances[:len(performances)//2]]
-            
-            recent_avg = sum(recent_scores) / len(recent_scores)
-            early_avg = sum(early_scores) / len(early_scores)
+        if quiz_stats.total_quizzes >= 4:
+            recent_avg = quiz_stats.recent_average
+            early_avg = quiz_stats.early_average
             
             if recent_avg > early_avg + 0.05:
                 trends['score_trend'] = 'improving'
@@ -407,13 +783,9 @@ class PerformanceTracker:
                 trends['score_trend'] = 'declining'
         
         # Reading speed trend
-        session_speeds = [s.reading_speed for s in sessions if s.reading_speed and s.reading_speed > 0]
-        if len(session_speeds) >= 4:
-            recent_speeds = session_speeds[-len(session_speeds)//2:]
-            early_speeds = session_speeds[:len(session_speeds)//2]
-            
-            recent_avg = sum(recent_speeds) / len(recent_speeds)
-            early_avg = sum(early_speeds) / len(early_speeds)
+        if session_stats.speed_sessions >= 4:
+            recent_avg = session_stats.recent_speed
+            early_avg = session_stats.early_speed
             
             if recent_avg > early_avg * 1.1:
                 trends['speed_trend'] = 'improving'
@@ -421,13 +793,9 @@ class PerformanceTracker:
                 trends['speed_trend'] = 'declining'
         
         # Engagement trend (based on focus scores)
-        focus_scores = [s.focus_score for s in sessions]
-        if len(focus_scores) >= 4:
-            recent_focus = focus_scores[-len(focus_scores)//2:]
-            early_focus = focus_scores[:len(focus_scores)//2]
-            
-            recent_avg = sum(recent_focus) / len(recent_focus)
-            early_avg = sum(early_focus) / len(early_focus)
+        if session_stats.total_sessions >= 4:
+            recent_avg = session_stats.recent_focus
+            early_avg = session_stats.early_focus
             
             if recent_avg > early_avg + 0.05:
                 trends['engagement_trend'] = 'improving'
@@ -440,10 +808,9 @@ class PerformanceTracker:
         """Analyze recent performance for a specific material"""
         try:
             # Get last 5 performances for this material
-            recent_performances = self.db.query(Performance).join(Quiz).filter(
-                Performance.user_id == user_id,
-                Quiz.material_id == material_id
-            ).order_by(Performance.created_at.desc()).limit(5).all()
+            recent_performances = self.db.execute(_RECENT_MATERIAL_PERFORMANCES_STMT, {
+                'user_id': user_id, 'material_id': material_id
+            }).all()
             
             if not recent_performances:
                 return {'status': 'no_data'}
@@ -452,23 +819,62 @@ class PerformanceTracker:
             avg_speed = sum(p.comprehension_speed for p in recent_performances if p.comprehension_speed) / len(recent_performances)
             
             # Determine learning status
-            if avg_score >= 0.8:
-                status = 'mastery'
-                recommendation = 'Ready for advanced material or spaced review'
-            elif avg_score >= 0.6:
-                status = 'progressing'
-                recommendation = 'Continue with current pace'
-            else:
-                status = 'struggling'
-                recommendation = 'Consider reviewing fundamentals or reducing difficulty'
+            status = next(
+                (name for threshold, name in _LEARNING_STATUS_THRESHOLDS if avg_score >= threshold),
+                _DEFAULT_LEARNING_STATUS
+            )
             
             return {
                 'status': status,
                 'average_score': avg_score,
                 'average_speed': avg_speed,
-                'recommendation': recommendation,
+                'recommendation': _STATUS_RECOMMENDATIONS[status],
                 'total_attempts': len(recent_performances)
             }
             
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
+    
+    def classify_cohort(self, user_ids: List[int], material_id: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Analyze recent performance on a material for many users at once
+        
+        Args:
+            user_ids: IDs of the users to classify
+            material_id: ID of the material
+            
+        Returns:
+            Dictionary mapping each user ID to the same analysis as a single
+            quiz submission returns ({'status': 'no_data'} without attempts)
+        """
+        analyses = {user_id: {'status': 'no_data'} for user_id in user_ids}
+        if not analyses:
+            return analyses
+        
+        try:
+            rows = self.db.execute(_COHORT_RECENT_STMT, {
+                'user_ids': list(analyses), 'material_id': material_id
+            }).all()
+            if not rows:
+                return analyses
+            
+            # Classify every user in one vectorized pass
+            scores = np.fromiter((row.average_score for row in rows), dtype=np.float64, count=len(rows))
+            statuses = np.select(
+                [scores >= threshold for threshold, _ in _LEARNING_STATUS_THRESHOLDS],
+                [name for _, name in _LEARNING_STATUS_THRESHOLDS],
+                default=_DEFAULT_LEARNING_STATUS
+            )
+            
+            for row, status in zip(rows, statuses.tolist()):
+                analyses[row.user_id] = {
+                    'status': status,
+                    'average_score': row.average_score,
+                    'average_speed': row.average_speed,
+                    'recommendation': _STATUS_RECOMMENDATIONS[status],
+                    'total_attempts': row.total_attempts
+                }
+            return analyses
+            
+        except Exception as e:
+            return {user_id: {'status': 'error', 'message': str(e)} for user_id in analyses}
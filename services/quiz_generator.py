@@ -1,8 +1,27 @@
 import random
 import re
-from typing import List, Dict, Any, Optional
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Sequence, Set
 from config import settings
 
+# Patterns are compiled once at import rather than looked up in re's cache per call
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Sentences matching any of these read as factual statements; fused into one
+# alternation so each sentence is scanned once
+_FACT_RE = re.compile('|'.join((
+    r'\b\d+\b',  # Contains numbers
+    r'\b(?:is|are|was|were|has|have|had)\b',  # Contains state verbs
+    r'\b(?:according to|research shows|studies indicate)\b',  # Research references
+    r'\b(?:defined as|refers to|means)\b'  # Definitions
+)), re.IGNORECASE)
+
+# (term, definition) patterns
+_DEFINITION_PATTERNS = (
+    re.compile(r'(\b[A-Z][a-z]+\b)\s+(?:is|are|refers to|means|defined as)\s+([^.!?]+)'),
+    re.compile(r'(\b[A-Z][a-z]+\b):\s*([^.!?]+)'),
+)
+
 class QuizGenerator:
     """Service for generating quizzes from text content"""
     
@@ -31,7 +50,7 @@ class QuizGenerator:
         try:
             # Extract potential quiz content
             sentences = QuizGenerator._extract_sentences(text)
-            facts = QuizGenerator._extract_facts(text)
+            facts = QuizGenerator._extract_facts(sentences)
             definitions = QuizGenerator._extract_definitions(text)
             
             if not sentences and not facts:
@@ -42,6 +61,13 @@ class QuizGenerator:
                 }
             
             questions = []
+            question_count = min(num_questions, len(sentences))
+            
+            # Tokenize each sentence the questions or distractors use once, shared by all generators
+            sentence_words = [sentence.split() for sentence in sentences[:max(20, question_count)]]
+            
+            # Candidate distractors for multiple choice, shared by every question
+            distractor_pool = QuizGenerator._build_distractor_pool(sentence_words)
             
             # Generate different types of questions
             question_types = [
@@ -58,18 +84,21 @@ class QuizGenerator:
                 # Harder questions - more fill in the blank and complex multiple choice
                 question_types = [('multiple_choice', 0.5), ('fill_blank', 0.3), ('true_false', 0.2)]
             
+            type_names, type_weights = zip(*question_types)
+            cum_weights = list(accumulate(type_weights))
+            
             # Generate questions
-            for i in range(min(num_questions, len(sentences))):
-                question_type = QuizGenerator._select_question_type(question_types)
+            for i in range(question_count):
+                question_type = QuizGenerator._select_question_type(type_names, cum_weights)
                 
                 if question_type == 'multiple_choice':
-                    question = QuizGenerator._generate_multiple_choice(sentences, facts, i)
+                    question = QuizGenerator._generate_multiple_choice(sentences, sentence_words, facts, i, distractor_pool)
                 elif question_type == 'true_false':
-                    question = QuizGenerator._generate_true_false(sentences, i)
+                    question = QuizGenerator._generate_true_false(sentences, sentence_words, i)
                 elif question_type == 'fill_blank':
-                    question = QuizGenerator._generate_fill_blank(sentences, i)
+                    question = QuizGenerator._generate_fill_blank(sentences, sentence_words, i)
                 else:
-                    question = QuizGenerator._generate_multiple_choice(sentences, facts, i)
+                    question = QuizGenerator._generate_multiple_choice(sentences, sentence_words, facts, i, distractor_pool)
                 
                 if question:
                     questions.append(question)
@@ -93,37 +122,34 @@ class QuizGenerator:
     def _extract_sentences(text: str) -> List[str]:
         """Extract meaningful sentences from text"""
         # Split by sentence-ending punctuation
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         
         # Filter and clean sentences
         meaningful_sentences = []
         for sentence in sentences:
             sentence = sentence.strip()
+            # Count words without building a token list: when single ASCII spaces are the
+            # only whitespace (isprintable() rules out tabs, newlines and Unicode spaces),
+            # words are spaces + 1; anything else takes the exact split()
+            if sentence.isprintable() and '  ' not in sentence:
+                word_count = sentence.count(' ') + 1
+            else:
+                word_count = len(sentence.split())
             # Keep sentences that are not too short or too long
-            if 10 <= len(sentence.split()) <= 50:
+            if 10 <= word_count <= 50:
                 meaningful_sentences.append(sentence)
         
         return meaningful_sentences
     
     @staticmethod
-    def _extract_facts(text: str) -> List[str]:
-        """Extract factual statements from text"""
+    def _extract_facts(sentences: List[str]) -> List[str]:
+        """Extract factual statements from sentences already split by _extract_sentences"""
         facts = []
-        sentences = QuizGenerator._extract_sentences(text)
         
         # Look for sentences that contain factual patterns
-        fact_patterns = [
-            r'\b\d+\b',  # Contains numbers
-            r'\b(is|are|was|were|has|have|had)\b',  # Contains state verbs
-            r'\b(according to|research shows|studies indicate)\b',  # Research references
-            r'\b(defined as|refers to|means)\b'  # Definitions
-        ]
-        
         for sentence in sentences:
-            for pattern in fact_patterns:
-                if re.search(pattern, sentence, re.IGNORECASE):
-                    facts.append(sentence)
-                    break
+            if _FACT_RE.search(sentence):
+                facts.append(sentence)
         
         return facts
     
@@ -133,13 +159,8 @@ class QuizGenerator:
         definitions = []
         
         # Look for definition patterns
-        definition_patterns = [
-            r'(\b[A-Z][a-z]+\b)\s+(?:is|are|refers to|means|defined as)\s+([^.!?]+)',
-            r'(\b[A-Z][a-z]+\b):\s*([^.!?]+)',
-        ]
-        
-        for pattern in definition_patterns:
-            matches = re.finditer(pattern, text)
+        for pattern in _DEFINITION_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 term = match.group(1)
                 definition = match.group(2).strip()
@@ -149,21 +170,26 @@ class QuizGenerator:
         return definitions
     
     @staticmethod
-    def _select_question_type(question_types: List[tuple]) -> str:
-        """Select question type based on weights"""
-        total_weight = sum(weight for _, weight in question_types)
-        r = random.random() * total_weight
-        
-        cumulative_weight = 0
-        for q_type, weight in question_types:
-            cumulative_weight += weight
-            if r <= cumulative_weight:
-                return q_type
-        
-        return question_types[0][0]  # Fallback
+    def _select_question_type(type_names: Sequence[str], cum_weights: List[float]) -> str:
+        """Select question type based on cumulative weights"""
+        return random.choices(type_names, cum_weights=cum_weights, k=1)[0]
     
     @staticmethod
-    def _generate_multiple_choice(sentences: List[str], facts: List[str], index: int) -> Optional[Dict[str, Any]]:
+    def _build_distractor_pool(sentence_words: List[List[str]]) -> Set[str]:
+        """Collect distractor words from the first 20 tokenized sentences"""
+        all_words = []
+        for words in sentence_words[:20]:
+            all_words.extend([word for word in words if len(word) > 4 and word.isalpha()])
+        return set(all_words)
+    
+    @staticmethod
+    def _generate_multiple_choice(
+        sentences: List[str],
+        sentence_words: List[List[str]],
+        facts: List[str],
+        index: int,
+        distractor_pool: Set[str]
+    ) -> Optional[Dict[str, Any]]:
         """Generate a multiple choice question"""
         try:
             if index >= len(sentences):
@@ -172,7 +198,7 @@ class QuizGenerator:
             base_sentence = sentences[index]
             
             # Extract key information from sentence
-            words = base_sentence.split()
+            words = sentence_words[index]
             if len(words) < 5:
                 return None
             
@@ -190,20 +216,18 @@ class QuizGenerator:
             options = [target_word]  # Correct answer
             
             # Generate distractors
-            all_words = []
-            for sentence in sentences[:20]:  # Use first 20 sentences for distractors
-                all_words.extend([word for word in sentence.split() if len(word) > 4 and word.isalpha()])
-            
-            distractors = list(set(all_words) - {target_word})
+            distractors = list(distractor_pool - {target_word})
             random.shuffle(distractors)
             
             # Add 3 distractors
             options.extend(distractors[:3])
             
-            # Shuffle options
-            correct_index = 0
-            random.shuffle(options)
-            correct_index = options.index(target_word)
+            # Shuffle positions rather than options so the correct answer (position 0)
+            # is found without comparing strings
+            order = list(range(len(options)))
+            random.shuffle(order)
+            options = [options[i] for i in order]
+            correct_index = order.index(0)
             
             return {
                 'type': 'multiple_choice',
@@ -218,7 +242,11 @@ class QuizGenerator:
             return None
     
     @staticmethod
-    def _generate_true_false(sentences: List[str], index: int) -> Optional[Dict[str, Any]]:
+    def _generate_true_false(
+        sentences: List[str],
+        sentence_words: List[List[str]],
+        index: int
+    ) -> Optional[Dict[str, Any]]:
         """Generate a true/false question"""
         try:
             if index >= len(sentences):
@@ -236,7 +264,7 @@ class QuizGenerator:
                 explanation = "This statement is true based on the provided content."
             else:
                 # Modify the sentence to make it false
-                words = base_sentence.split()
+                words = sentence_words[index]
                 if len(words) < 5:
                     return None
                 
@@ -287,14 +315,17 @@ class QuizGenerator:
             return None
     
     @staticmethod
-    def _generate_fill_blank(sentences: List[str], index: int) -> Optional[Dict[str, Any]]:
+    def _generate_fill_blank(
+        sentences: List[str],
+        sentence_words: List[List[str]],
+        index: int
+    ) -> Optional[Dict[str, Any]]:
         """Generate a fill-in-the-blank question"""
         try:
             if index >= len(sentences):
                 return None
             
-            base_sentence = sentences[index]
-            words = base_sentence.split()
+            words = sentence_words[index]
             
             if len(words) < 6:
                 return None
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from models import User, Material, Schedule, Performance, StudySession, Quiz
 import math
 
@@ -145,8 +145,10 @@ class StudyScheduler:
             if not user:
                 return []
             
-            # Get recent performance records
-            performance_query = self.db.query(Performance).filter(Performance.user_id == user_id)
+            # Get recent performance records; the response JSON is never read here
+            performance_query = self.db.query(Performance).options(
+                defer(Performance.question_responses)
+            ).filter(Performance.user_id == user_id)
             if material_id:
                 performance_query = performance_query.join(Quiz).filter(Quiz.material_id == material_id)
             
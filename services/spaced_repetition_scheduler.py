@@ -484,8 +484,8 @@ class SpacedRepetitionScheduler:
         """Get user's HLR learning profile"""
         user = self.db.query(User).filter(User.id == user_id).first()
         
-        # Get historical performance for personalization
-        recent_performances = self.db.query(Performance).filter(
+        # Get historical performance for personalization (only the averaged columns)
+        recent_performances = self.db.query(Performance.score, Performance.time_taken).filter(
             Performance.user_id == user_id
         ).order_by(Performance.created_at.desc()).limit(20).all()
         